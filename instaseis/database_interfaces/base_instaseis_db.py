@@ -11,7 +11,10 @@ Abstract base class for all Instaseis database classes.
     (http://www.gnu.org/copyleft/lgpl.html)
 """
 from abc import ABCMeta, abstractmethod
+import collections
+import concurrent.futures
 from distutils.version import LooseVersion
+import itertools
 import math
 import warnings
 
@@ -20,6 +23,7 @@ from obspy.core import AttribDict, Stream, Trace, UTCDateTime
 from obspy.geodetics import locations2degrees
 from obspy.signal.interpolation import lanczos_interpolation
 from scipy.integrate import cumtrapz
+import scipy.fft
 import scipy.signal
 
 from ..source import Source, ForceSource, Receiver, FiniteSource
@@ -29,6 +33,11 @@ from ..helpers import get_band_code, sizeof_fmt, rfftfreq
 DEFAULT_MU = 32e9
 
 
+# Number of point sources whose seismograms are stacked in one go when
+# summing finite sources. Bounds the memory of the stacking buffers.
+FINITE_SOURCE_BLOCK_SIZE = 256
+
+
 KIND_MAP = {"displacement": 0, "velocity": 1, "acceleration": 2}
 
 
@@ -60,6 +69,25 @@ def _diff_and_integrate(n_derivative, data, comp, dt_out):
         data[comp] = cumtrapz(data[comp], dx=dt_out, initial=0.0)
 
 
+def _parse_receiver(receiver):
+    """
+    Parse a single receiver if it is not already a Receiver object.
+    """
+    if isinstance(receiver, Receiver):
+        return receiver
+    # This only works in the special case of one station, otherwise
+    # it has to be called more then once.
+    rec = Receiver.parse(receiver)
+    if len(rec) != 1:
+        raise ValueError(
+            "Receiver object/file contains multiple "
+            "stations. Please parse outside the "
+            "get_seismograms() function and call in a "
+            "loop."
+        )
+    return rec[0]
+
+
 class BaseInstaseisDB(metaclass=ABCMeta):
     """
     Base class for all Instaseis database classes defining the user interface.
@@ -241,6 +269,7 @@ class BaseInstaseisDB(metaclass=ABCMeta):
         return_obspy_stream=True,
         dt=None,
         kernelwidth=12,
+        fft_workers=-1,
     ):
         """
         Extract seismograms from the Green's function database.
@@ -278,6 +307,10 @@ class BaseInstaseisDB(metaclass=ABCMeta):
         :param kernelwidth: The width of the sinc kernel used for resampling in
             terms of the original sampling interval. Best choose something
             between 10 and 20.
+        :type fft_workers: int, optional
+        :param fft_workers: Number of threads used by the Fourier transforms
+            of the source time function reconvolution. Negative values count
+            back from the number of CPUs, the default uses all of them.
 
         :returns: Multi component seismograms.
         :rtype: A :class:`obspy.core.stream.Stream` object or a dictionary
@@ -304,8 +337,6 @@ class BaseInstaseisDB(metaclass=ABCMeta):
         else:
             dt_out = dt
 
-        stf_deconv_map = {0: self.info.sliprate, 1: self.info.slip}
-
         # Can never be negative with the current logic.
         n_derivative = KIND_MAP[kind] - STF_MAP[self.info.stf]
 
@@ -328,55 +359,64 @@ class BaseInstaseisDB(metaclass=ABCMeta):
             reconvolve_stf=reconvolve_stf,
         )
 
-        for comp in components:
-            if reconvolve_stf:
-                # We assume here that the sliprate is well-behaved,
-                # e.g. zeros at the boundaries and no energy above the mesh
-                # resolution.
-                if source.dt is None or source.sliprate is None:
-                    raise ValueError("source has no source time function")
-
-                if STF_MAP[self.info.stf] not in [0, 1]:
-                    raise NotImplementedError(
-                        "deconvolution not implemented for stf %s"
-                        % (self.info.stf)
-                    )
-
-                stf_deconv_f = np.fft.rfft(
-                    stf_deconv_map[STF_MAP[self.info.stf]], n=self.info.nfft
+        if reconvolve_stf:
+            # We assume here that the sliprate is well-behaved,
+            # e.g. zeros at the boundaries and no energy above the mesh
+            # resolution.
+            if source.dt is None or source.sliprate is None:
+                raise ValueError("source has no source time function")
+
+            if STF_MAP[self.info.stf] not in [0, 1]:
+                raise NotImplementedError(
+                    "deconvolution not implemented for stf %s"
+                    % (self.info.stf)
                 )
 
-                if abs((source.dt - self.info.dt) / self.info.dt) > 1e-7:
-                    raise ValueError("dt of the source not compatible")
-
-                stf_conv_f = np.fft.rfft(source.sliprate, n=self.info.nfft)
-
-                if source.time_shift is not None:
-                    stf_conv_f *= np.exp(
-                        -1j
-                        * rfftfreq(self.info.nfft)
-                        * 2.0
-                        * np.pi
-                        * source.time_shift
-                        / self.info.dt
-                    )
-
-                # Apply a 5 percent, at least 5 samples taper at the end.
-                # The first sample is guaranteed to be zero in any case.
-                tlen = max(int(math.ceil(0.05 * len(data[comp]))), 5)
-                taper = np.ones_like(data[comp])
-                taper[-tlen:] = scipy.signal.hann(tlen * 2)[tlen:]
-                dataf = np.fft.rfft(taper * data[comp], n=self.info.nfft)
-
-                # Ensure numerical stability by not dividing with zero.
-                f = stf_conv_f
-                _l = np.abs(stf_deconv_f)
-                _idx = np.where(_l > 0.0)
-                f[_idx] /= stf_deconv_f[_idx]
-                f[_l == 0] = 0 + 0j
-
-                data[comp] = np.fft.irfft(dataf * f)[: self.info.npts]
+            stf_deconv_f = self._get_stf_deconv_f()
+
+            if abs((source.dt - self.info.dt) / self.info.dt) > 1e-7:
+                raise ValueError("dt of the source not compatible")
+
+            # The filter only depends on the source so it is the same for
+            # all components.
+            stf_conv_f = scipy.fft.rfft(
+                source.sliprate, n=self.info.nfft, workers=fft_workers
+            )
 
+            if source.time_shift is not None:
+                stf_conv_f *= np.exp(
+                    -1j
+                    * rfftfreq(self.info.nfft)
+                    * 2.0
+                    * np.pi
+                    * source.time_shift
+                    / self.info.dt
+                )
+
+            # Ensure numerical stability by not dividing with zero.
+            f = stf_conv_f
+            _l = np.abs(stf_deconv_f)
+            _idx = np.where(_l > 0.0)
+            f[_idx] /= stf_deconv_f[_idx]
+            f[_l == 0] = 0 + 0j
+
+            # All components have the same length so they are filtered with
+            # a single batched transform. Single precision data stays single
+            # precision.
+            stacked = np.vstack([data[comp] for comp in components])
+            taper = self._get_reconvolution_taper(stacked.shape[1])
+            stacked *= taper
+            dataf = scipy.fft.rfft(
+                stacked, n=self.info.nfft, axis=-1, workers=fft_workers
+            )
+            dataf *= f
+            reconvolved = scipy.fft.irfft(
+                dataf, n=self.info.nfft, axis=-1, workers=fft_workers
+            )[:, : self.info.npts]
+            for i, comp in enumerate(components):
+                data[comp] = reconvolved[i]
+
+        for comp in components:
             if dt is not None:
                 data[comp] = lanczos_interpolation(
                     data=np.require(data[comp], requirements=["C"]),
@@ -419,6 +459,61 @@ class BaseInstaseisDB(metaclass=ABCMeta):
         else:
             return data
 
+    def _prefetch_finite_source(self, sources, receiver):
+        """
+        Hook for implementations to do work for all point sources of a
+        finite source at once before they are extracted one by one.
+
+        Anything kept for the extraction must be released again in
+        :meth:`_clear_finite_source_prefetch`.
+        """
+        pass
+
+    def _clear_finite_source_prefetch(self):
+        """
+        Hook called once the seismograms of a finite source are extracted
+        or the extraction failed.
+        """
+        pass
+
+    def _get_stf_deconv_f(self):
+        """
+        Spectrum of the source time function used to generate the database.
+
+        Only depends on the database so it is computed once and cached.
+        """
+        try:
+            return self.__cached_stf_deconv_f
+        except Exception:
+            pass
+        stf_deconv_map = {0: self.info.sliprate, 1: self.info.slip}
+        self.__cached_stf_deconv_f = scipy.fft.rfft(
+            stf_deconv_map[STF_MAP[self.info.stf]],
+            n=self.info.nfft,
+            workers=-1,
+        )
+        return self.__cached_stf_deconv_f
+
+    def _get_reconvolution_taper(self, npts):
+        """
+        Taper applied to the data before reconvolving the source time
+        function.
+
+        Only depends on the number of samples so it is cached.
+        """
+        try:
+            tapers = self.__cached_reconvolution_tapers
+        except Exception:
+            tapers = self.__cached_reconvolution_tapers = {}
+        if npts not in tapers:
+            # Apply a 5 percent, at least 5 samples taper at the end.
+            # The first sample is guaranteed to be zero in any case.
+            tlen = max(int(math.ceil(0.05 * npts)), 5)
+            taper = np.ones(npts)
+            taper[-tlen:] = scipy.signal.hann(tlen * 2)[tlen:]
+            tapers[npts] = taper
+        return tapers[npts]
+
     @staticmethod
     def _convert_to_stream(
         receiver, components, data, dt_out, starttime, add_band_code=True
@@ -475,6 +570,7 @@ class BaseInstaseisDB(metaclass=ABCMeta):
         kernelwidth=12,
         correct_mu=False,
         progress_callback=None,
+        workers=1,
     ):
         """
         Extract seismograms for a finite source from an Instaseis database.
@@ -509,6 +605,14 @@ class BaseInstaseisDB(metaclass=ABCMeta):
             sources for each calculated source. Useful for integration into
             user interfaces to provide some kind of progress information. If
             the callback returns ``True``, the calculation will be cancelled.
+        :type workers: int, optional
+        :param workers: Number of threads used to extract the seismograms of
+            the single point sources. The I/O is serialized but the
+            interpolation, the strain computation, and the reconvolution
+            release the GIL and run in parallel. The Fourier transforms of
+            the reconvolution use all CPUs for a single worker and one
+            thread per worker otherwise, so the pool does not oversubscribe
+            the CPUs.
 
         :returns: Multi component finite source seismogram.
         :rtype: :class:`obspy.core.stream.Stream`
@@ -519,12 +623,16 @@ class BaseInstaseisDB(metaclass=ABCMeta):
         if not self.info.is_reciprocal:
             raise NotImplementedError
 
-        data_summed = {}
-        count = len(sources)
-        for _i, source in enumerate(sources):
+        # The receiver is the same for all sources so only parse it once.
+        receiver = _parse_receiver(receiver)
+
+        # The pool threads already run in parallel.
+        fft_workers = 1 if workers > 1 else -1
+
+        def _get_seismograms(source):
             # Don't perform the diff/integration here, but after the
             # resampling later on.
-            data = self.get_seismograms(
+            return self.get_seismograms(
                 source,
                 receiver,
                 components,
@@ -533,23 +641,72 @@ class BaseInstaseisDB(metaclass=ABCMeta):
                 kind=INV_KIND_MAP[STF_MAP[self.info.stf]],
                 return_obspy_stream=False,
                 remove_source_shift=False,
+                fft_workers=fft_workers,
             )
 
-            if correct_mu:
-                corr_fac = (data["mu"] / DEFAULT_MU,)
-            else:
-                corr_fac = 1
+        data_summed = {}
+        count = len(sources)
+        block_size = min(count, FINITE_SOURCE_BLOCK_SIZE)
+        # The seismograms of a block of sources are collected and then
+        # summed with a single weighted matrix-vector product.
+        buffers = {}
+        weights = np.ones(block_size)
+
+        # The results are returned in order so they are summed in the same
+        # order in either case. At most one block of sources is in flight
+        # and every result is dropped once it is taken so the memory use
+        # stays bounded by the block size.
+        pending = collections.deque()
+
+        def _get_seismograms_threaded():
+            sources_iter = iter(sources)
+            while True:
+                for _s in itertools.islice(
+                    sources_iter, block_size - len(pending)
+                ):
+                    pending.append(executor.submit(_get_seismograms, _s))
+                if not pending:
+                    return
+                yield pending.popleft().result()
+
+        if workers > 1:
+            executor = concurrent.futures.ThreadPoolExecutor(workers)
+            all_data = _get_seismograms_threaded()
+        else:
+            executor = None
+            all_data = map(_get_seismograms, sources)
 
-            for comp in components:
-                if comp in data_summed:
-                    data_summed[comp] += data[comp] * corr_fac
-                else:
-                    data_summed[comp] = data[comp] * corr_fac
-            # Only used for the GUI.
-            if progress_callback:  # pragma: no cover
-                cancel = progress_callback(_i + 1, count)
-                if cancel:
-                    return None
+        try:
+            self._prefetch_finite_source(sources, receiver)
+            for _i, data in enumerate(all_data):
+                _j = _i % block_size
+                if correct_mu:
+                    weights[_j] = data["mu"] / DEFAULT_MU
+
+                for comp in components:
+                    if comp not in buffers:
+                        buffers[comp] = np.empty((block_size, len(data[comp])))
+                        data_summed[comp] = np.zeros(len(data[comp]))
+                    buffers[comp][_j] = data[comp]
+
+                if _j == block_size - 1 or _i == count - 1:
+                    for comp in components:
+                        data_summed[comp] += weights[: _j + 1].dot(
+                            buffers[comp][: _j + 1]
+                        )
+
+                # Only used for the GUI.
+                if progress_callback:  # pragma: no cover
+                    cancel = progress_callback(_i + 1, count)
+                    if cancel:
+                        return None
+        finally:
+            if executor is not None:
+                # Don't start any more work if cancelled or on errors.
+                for _f in pending:
+                    _f.cancel()
+                executor.shutdown(wait=True)
+            self._clear_finite_source_prefetch()
 
         if dt is not None:
             for comp in components:
@@ -720,18 +877,7 @@ class BaseInstaseisDB(metaclass=ABCMeta):
             source, ForceSource
         ):
             source = Source.parse(source)
-        if not isinstance(receiver, Receiver):
-            # This only works in the special case of one station, otherwise
-            # it has to be called more then once.
-            rec = Receiver.parse(receiver)
-            if len(rec) != 1:
-                raise ValueError(
-                    "Receiver object/file contains multiple "
-                    "stations. Please parse outside the "
-                    "get_seismograms() function and call in a "
-                    "loop."
-                )
-            receiver = rec[0]
+        receiver = _parse_receiver(receiver)
 
         if kind not in ["displacement", "velocity", "acceleration"]:
             raise ValueError("unknown kind '%s'" % (kind,))
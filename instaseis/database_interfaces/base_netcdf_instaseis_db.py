@@ -15,8 +15,8 @@ from abc import ABCMeta, abstractmethod
 import collections
 
 import numpy as np
-from obspy.signal.util import next_pow_2
 import os
+from scipy.fft import next_fast_len
 
 from .base_instaseis_db import BaseInstaseisDB
 from .. import finite_elem_mapping
@@ -24,6 +24,7 @@ from .. import helpers
 from .. import rotations
 from .. import sem_derivatives
 from .. import spectral_basis
+from ..source import Source, ForceSource
 
 
 ElementInfo = collections.namedtuple(
@@ -43,6 +44,30 @@ ElementInfo = collections.namedtuple(
 
 Coordinates = collections.namedtuple("Coordinates", ["s", "phi", "z"])
 
+STRAIN_FCT_MAP = {
+    "monopole": sem_derivatives.strain_monopole_td,
+    "dipole": sem_derivatives.strain_dipole_td,
+    "quadpole": sem_derivatives.strain_quadpole_td,
+}
+
+# Column and sign of each stored strain component in the Voigt mapping
+# (dsus, dpup, dzuz, dzup, dsuz, dsup). dzuz is not stored but is computed
+# from the trace.
+VOIGT_COLUMNS = collections.OrderedDict(
+    [
+        ("strain_dsus", (0, 1.0)),
+        ("strain_dsuz", (4, 1.0)),
+        ("strain_dpup", (1, 1.0)),
+        ("strain_dsup", (5, -1.0)),
+        ("strain_dzup", (3, -1.0)),
+        ("straintrace", (2, 1.0)),
+    ]
+)
+
+# Largest gap between the ids of the GLL points of one element that is still
+# read with a single slice.
+IO_MAX_GAP = 8
+
 
 class BaseNetCDFInstaseisDB(BaseInstaseisDB, metaclass=ABCMeta):
     """
@@ -55,6 +80,8 @@ class BaseNetCDFInstaseisDB(BaseInstaseisDB, metaclass=ABCMeta):
         db_path,
         buffer_size_in_mb=100,
         read_on_demand=False,
+        precision="double",
+        chunk_cache_size_in_mb=None,
         *args,
         **kwargs,
     ):
@@ -74,25 +101,87 @@ class BaseNetCDFInstaseisDB(BaseInstaseisDB, metaclass=ABCMeta):
             initialization, faster in individual seismogram extraction,
             useful e.g. for finite sources, default).
         :type read_on_demand: bool, optional
+        :param precision: Either ``"double"`` or ``"single"``. In single
+            precision the interpolated strain of moment tensor sources and
+            everything computed from it is stored as 32 bit floats which
+            halves the memory traffic at the cost of accuracy.
+        :type precision: str, optional
+        :param chunk_cache_size_in_mb: Size of the HDF5 chunk cache of each
+            netCDF file. Only matters for chunked (e.g. compressed)
+            databases where the default cache of 1 MB might be too small to
+            hold the chunks touched while reading an element. Defaults to
+            the HDF5 default.
+        :type chunk_cache_size_in_mb: float, optional
         """
+        if precision not in ("single", "double"):
+            raise ValueError("precision must be 'single' or 'double'.")
+
         self.db_path = db_path
         self.buffer_size_in_mb = buffer_size_in_mb
         self.read_on_demand = read_on_demand
+        self.chunk_cache_size_in_mb = chunk_cache_size_in_mb
+        self.precision = precision
+        self._working_dtype = (
+            np.float32 if precision == "single" else np.float64
+        )
+        # Coordinates and kd-tree query results of the point sources of the
+        # finite source currently being extracted, keyed by the ids of the
+        # source and receiver objects.
+        self._finite_source_prefetch = {}
+
+    def _query_kdtree(self, points):
+        k_map = {"displ_only": 10, "strain_only": 1, "fullfields": 1}
+        return self.parsed_mesh.kdtree.query(
+            points, k=k_map[self.info.dump_type], workers=-1
+        )
+
+    def _prefetch_finite_source(self, sources, receiver):
+        """
+        Query the kd-tree for all point sources in one go.
+
+        The finite source keeps the source and receiver objects alive until
+        the results are released again so their ids are unique keys.
+        """
+        sources = [s for s in sources if isinstance(s, (Source, ForceSource))]
+        if not sources:
+            return
+        coordinates = [self._get_coordinates(s, receiver) for s in sources]
+        distances, indices = self._query_kdtree(
+            [[c.s, c.z] for c in coordinates]
+        )
+        self._finite_source_prefetch = {
+            (id(s), id(receiver)): (c, (distances[_i], indices[_i]))
+            for _i, (s, c) in enumerate(zip(sources, coordinates))
+        }
 
-    def _get_element_info(self, coordinates):
+    def _clear_finite_source_prefetch(self):
+        self._finite_source_prefetch = {}
+
+    def _get_element_info(self, coordinates, nextpoints=None):
         """
         Find and collect/calculate information about the element containing
         the given coordinates.
-        """
-        k_map = {"displ_only": 10, "strain_only": 1, "fullfields": 1}
 
-        nextpoints = self.parsed_mesh.kdtree.query(
-            [coordinates.s, coordinates.z], k=k_map[self.info.dump_type]
-        )
+        ``nextpoints`` are the results of an earlier kd-tree query for the
+        coordinates, if any.
+        """
+        if nextpoints is None:
+            nextpoints = self._query_kdtree([coordinates.s, coordinates.z])
 
         # Find the element containing the point of interest.
         mesh = self.parsed_mesh.f["Mesh"]
         if self.info.dump_type == "displ_only":
+            # Skip all elements whose bounding box does not contain the
+            # point.
+            candidates = nextpoints[1]
+            bbox = self.parsed_mesh.element_bbox[:, candidates]
+            candidates = candidates[
+                (bbox[0] <= coordinates.s)
+                & (coordinates.s <= bbox[1])
+                & (bbox[2] <= coordinates.z)
+                & (coordinates.z <= bbox[3])
+            ]
+
             # Loop over multiple tolerances - this is mainly needed for
             # legacy regional databases that have small elements far from the
             # core.
@@ -102,35 +191,9 @@ class BaseNetCDFInstaseisDB(BaseInstaseisDB, metaclass=ABCMeta):
             # tolerance thus there is not runtime cost.
             id_elem = None
             for tolerance in [1e-3, 1e-2, 5e-2, 8e-2]:
-                for idx in nextpoints[1]:
-                    corner_points = np.empty((4, 2), dtype="float64")
-
-                    if not self.read_on_demand:
-                        corner_point_ids = self.parsed_mesh.fem_mesh[idx][:4]
-                        eltype = self.parsed_mesh.eltypes[idx]
-                        corner_points[:, 0] = self.parsed_mesh.mesh_S[
-                            corner_point_ids
-                        ]
-                        corner_points[:, 1] = self.parsed_mesh.mesh_Z[
-                            corner_point_ids
-                        ]
-                    else:
-                        corner_point_ids = mesh["fem_mesh"][idx][:4]
-
-                        # When reading from a netcdf file, the indices must be
-                        # sorted for newer netcdf versions. The double
-                        # argsort() gives the indices in the sorted array to
-                        # restore the original order.
-                        eltype = mesh["eltype"][idx]
-
-                        m_s = mesh["mesh_S"]
-                        m_z = mesh["mesh_Z"]
-                        corner_points[:, 0] = [
-                            m_s[_i] for _i in corner_point_ids
-                        ]
-                        corner_points[:, 1] = [
-                            m_z[_i] for _i in corner_point_ids
-                        ]
+                for idx in candidates:
+                    eltype = self.parsed_mesh.eltypes[idx]
+                    corner_points = self.parsed_mesh.element_corners[idx].T
 
                     isin, xi, eta = finite_elem_mapping.inside_element(
                         coordinates.s,
@@ -149,10 +212,16 @@ class BaseNetCDFInstaseisDB(BaseInstaseisDB, metaclass=ABCMeta):
 
             if not self.read_on_demand:
                 gll_point_ids = self.parsed_mesh.sem_mesh[id_elem]
-                axis = bool(self.parsed_mesh.axis[id_elem])
             else:
-                gll_point_ids = mesh["sem_mesh"][id_elem]
-                axis = bool(mesh["axis"][id_elem])
+                gll_point_ids = self.parsed_mesh.gll_point_ids_buffer.get(
+                    id_elem
+                )
+                if gll_point_ids is None:
+                    gll_point_ids = mesh["sem_mesh"][id_elem]
+                    self.parsed_mesh.gll_point_ids_buffer.add(
+                        id_elem, gll_point_ids
+                    )
+            axis = bool(self.parsed_mesh.axis[id_elem])
 
             if axis:
                 col_points_xi = self.parsed_mesh.glj_points
@@ -215,6 +284,30 @@ class BaseNetCDFInstaseisDB(BaseInstaseisDB, metaclass=ABCMeta):
         :param components: The requests components. Any combinations of
             ``"Z"``, ``"N"``, ``"E"``, ``"R"``, and ``"T"``
         """
+        try:
+            coordinates, nextpoints = self._finite_source_prefetch[
+                (id(source), id(receiver))
+            ]
+        except KeyError:
+            coordinates = self._get_coordinates(source, receiver)
+            nextpoints = None
+
+        element_info = self._get_element_info(
+            coordinates=coordinates, nextpoints=nextpoints
+        )
+
+        return self._get_data(
+            source=source,
+            receiver=receiver,
+            components=components,
+            coordinates=coordinates,
+            element_info=element_info,
+        )
+
+    def _get_coordinates(self, source, receiver):
+        """
+        Coordinates of the source or receiver in the frame of the database.
+        """
         if self.info.is_reciprocal:
             a, b = source, receiver
         else:
@@ -228,17 +321,59 @@ class BaseNetCDFInstaseisDB(BaseInstaseisDB, metaclass=ABCMeta):
             b.colatitude,
         )
 
-        coordinates = Coordinates(s=rotmesh_s, phi=rotmesh_phi, z=rotmesh_z)
-
-        element_info = self._get_element_info(coordinates=coordinates)
+        return Coordinates(s=rotmesh_s, phi=rotmesh_phi, z=rotmesh_z)
 
-        return self._get_data(
-            source=source,
-            receiver=receiver,
-            components=components,
-            coordinates=coordinates,
-            element_info=element_info,
-        )
+    def _read_displacement(self, mesh, gll_point_ids, utemp):
+        """
+        Read the displacement at the GLL points of one element into utemp
+        which is indexed as [time, jpol, ipol, component].
+        """
+        # The netCDF Python wrappers starting with version 1.1.6 disallow
+        # duplicate and unordered indices while slicing. So we need to do it
+        # manually.
+        # The list of ids we have is unique but not sorted.
+        ids = gll_point_ids.ravel()
+
+        # Chunk the I/O by requesting nearby indices with a single slice -
+        # this actually makes quite a big difference on some file systems.
+        # The points on the edges shared with neighbouring elements
+        # interleave with small gaps so these are read as well.
+        starts, stops = helpers.io_ranges(np.sort(ids), max_gap=IO_MAX_GAP)
+        chunks = [slice(_a, _b) for _a, _b in zip(starts, stops)]
+
+        # Position of each GLL point in the concatenated reads.
+        run = np.searchsorted(starts, ids, side="right") - 1
+        offsets = np.concatenate([[0], np.cumsum(stops - starts)[:-1]])
+        s_idx = offsets[run] + ids - starts[run]
+
+        comps = []
+        temps = []
+        for i, ds, time_axis in mesh.displacement_datasets:
+            # Make sure it can work with normal and transposed arrays to
+            # support legacy as well as modern, transposed databases. Both
+            # are read as [point, time] which is the native layout of the
+            # transposed databases.
+            if time_axis == 0:
+                _temp = [ds[:, _c].T for _c in chunks]
+            else:
+                _temp = [ds[_c, :] for _c in chunks]
+
+            comps.append(i)
+            temps.append(np.concatenate(_temp, axis=0))
+
+        # Undo the sorting and unpack all components at once. utemp is
+        # Fortran ordered so its transpose is a C-contiguous view indexed as
+        # [component, ipol, jpol, time] and every GLL point is copied as one
+        # contiguous block. Single precision in the files - the assignment
+        # casts to the dtype of utemp.
+        if comps:
+            utemp.T[comps] = np.stack(temps)[:, s_idx].reshape(
+                -1, mesh.npol + 1, mesh.npol + 1, mesh.ndumps
+            )
+        # Components not in the file are zero.
+        missing = [i for i in range(3) if i not in comps]
+        if missing:
+            utemp[:, :, :, missing] = 0.0
 
     def _get_strain_interp(  # NOQA
         self,
@@ -255,78 +390,17 @@ class BaseNetCDFInstaseisDB(BaseInstaseisDB, metaclass=ABCMeta):
         xi,
         eta,
     ):
-        if id_elem not in mesh.strain_buffer:
+        strain = mesh.strain_buffer.get(id_elem)
+        if strain is None:
             # Single precision in the NetCDF files but the later interpolation
             # routines require double precision. Assignment to this array will
-            # force a cast.
-            utemp = np.zeros(
-                (mesh.ndumps, mesh.npol + 1, mesh.npol + 1, 3),
-                dtype=np.float64,
-                order="F",
-            )
-
-            # The list of ids we have is unique but not sorted.
-            ids = gll_point_ids.flatten()
-            s_ids = np.sort(ids)
-            mesh_dict = mesh.f["Snapshots"]
+            # force a cast. Only the strain is buffered so the displacement
+            # can go to a reused scratch array.
+            utemp = mesh.get_utemp_scratch()
 
-            # Load displacement from all GLL points.
-            for i, var in enumerate(["disp_s", "disp_p", "disp_z"]):
-                if var not in mesh_dict:
-                    continue
+            self._read_displacement(mesh, gll_point_ids, utemp)
 
-                # Make sure it can work with normal and transposed arrays to
-                # support legacy as well as modern, transposed databases.
-                time_axis = mesh.time_axis[var]
-
-                # Chunk the I/O by requesting successive indices in one go -
-                # this actually makes quite a big difference on some file
-                # systems.
-                chunks = helpers.io_chunker(s_ids)
-                _temp = []
-                m = mesh_dict[var]
-                if time_axis == 0:
-                    for _c in chunks:
-                        if isinstance(_c, list):
-                            _temp.append(m[:, _c[0] : _c[1]])  # NOQA
-                        else:
-                            _temp.append(m[:, _c])
-                else:
-                    for _c in chunks:
-                        if isinstance(_c, list):
-                            _temp.append(m[_c[0] : _c[1], :].T)  # NOQA
-                        else:
-                            _temp.append(m[_c, :].T)
-
-                _t = np.empty((_temp[0].shape[0], 25), dtype=_temp[0].dtype)
-
-                k = 0
-                for _i in _temp:
-                    if len(_i.shape) == 1:
-                        _t[:, k] = _i
-                        k += 1
-                    else:
-                        for _j in range(_i.shape[1]):
-                            _t[:, k + _j] = _i[:, _j]
-
-                        k += _j + 1
-
-                _temp = _t
-
-                for ipol in range(mesh.npol + 1):
-                    for jpol in range(mesh.npol + 1):
-                        idx = ipol * 5 + jpol
-                        utemp[:, jpol, ipol, i] = _temp[
-                            :, np.argwhere(s_ids == ids[idx])[0][0]
-                        ]
-
-            strain_fct_map = {
-                "monopole": sem_derivatives.strain_monopole_td,
-                "dipole": sem_derivatives.strain_dipole_td,
-                "quadpole": sem_derivatives.strain_quadpole_td,
-            }
-
-            strain = strain_fct_map[mesh.excitation_type](
+            strain = STRAIN_FCT_MAP[mesh.excitation_type](
                 utemp,
                 G,
                 GT,
@@ -337,42 +411,34 @@ class BaseNetCDFInstaseisDB(BaseInstaseisDB, metaclass=ABCMeta):
                 corner_points,
                 eltype,
                 axis,
-            )
+            ).astype(self._working_dtype, copy=False)
 
+            # Buffered in the working precision.
             mesh.strain_buffer.add(id_elem, strain)
-        else:
-            strain = mesh.strain_buffer.get(id_elem)
-
-        final_strain = np.empty((strain.shape[0], 6), order="F")
 
-        for i in range(6):
-            final_strain[:, i] = spectral_basis.lagrange_interpol_2D_td(
-                col_points_xi, col_points_eta, strain[:, :, :, i], xi, eta
-            )
+        final_strain = spectral_basis.lagrange_interpol_2D_td_batched(
+            col_points_xi, col_points_eta, strain, xi, eta
+        )
 
         if not mesh.excitation_type == "monopole":
-            final_strain[:, 3] *= -1.0
-            final_strain[:, 5] *= -1.0
+            # Flips the sign of columns 3 and 5 in one go.
+            final_strain[:, 3::2] *= -1.0
 
-        return final_strain
+        return final_strain.astype(self._working_dtype, copy=False)
 
     def _get_strain(self, mesh, id_elem):
-        if id_elem not in mesh.strain_buffer:
-            strain_temp = np.zeros((self.info.npts, 6), order="F")
+        final_strain = mesh.strain_buffer.get(id_elem)
+        if final_strain is None:
+            # Directly read into the voigt mapping.
+            # dsus, dpup, dzuz, dzup, dsuz, dsup
+            final_strain = np.empty((self.info.npts, 6), order="F")
 
             mesh_dict = mesh.f["Snapshots"]
 
-            for i, var in enumerate(
-                [
-                    "strain_dsus",
-                    "strain_dsuz",
-                    "strain_dpup",
-                    "strain_dsup",
-                    "strain_dzup",
-                    "straintrace",
-                ]
-            ):
+            for var, (i, sign) in VOIGT_COLUMNS.items():
+                # Components not in the file are zero.
                 if var not in mesh_dict:
+                    final_strain[:, i] = 0.0
                     continue
 
                 # Make sure it can work with normal and transposed arrays to
@@ -380,29 +446,27 @@ class BaseNetCDFInstaseisDB(BaseInstaseisDB, metaclass=ABCMeta):
                 time_axis = mesh.time_axis[var]
 
                 if time_axis == 0:
-                    strain_temp[:, i] = mesh_dict[var][:, id_elem]
+                    data = mesh_dict[var][:, id_elem]
                 else:  # pragma: no cover
                     # We don't have an example for this yet so we just raise
                     # here for now - implementing it should just be a matter
                     # of uncommenting the following line.
                     #
-                    # strain_temp[:, i] = mesh_dict[var][id_elem, :]
+                    # data = mesh_dict[var][id_elem, :]
                     raise NotImplementedError
 
-            # transform strain to voigt mapping
-            # dsus, dpup, dzuz, dzup, dsuz, dsup
-            final_strain = np.empty((self.info.npts, 6), order="F")
-            final_strain[:, 0] = strain_temp[:, 0]
-            final_strain[:, 1] = strain_temp[:, 2]
-            final_strain[:, 2] = (
-                strain_temp[:, 5] - strain_temp[:, 0] - strain_temp[:, 2]
-            )
-            final_strain[:, 3] = -strain_temp[:, 4]
-            final_strain[:, 4] = strain_temp[:, 1]
-            final_strain[:, 5] = -strain_temp[:, 3]
+                # Flip the sign while copying into the column.
+                if sign < 0.0:
+                    np.negative(data, out=final_strain[:, i])
+                else:
+                    final_strain[:, i] = data
+
+            # dzuz = trace - dsus - dpup
+            final_strain[:, 2] -= final_strain[:, 0]
+            final_strain[:, 2] -= final_strain[:, 1]
+
+            final_strain = final_strain.astype(self._working_dtype, copy=False)
             mesh.strain_buffer.add(id_elem, final_strain)
-        else:
-            final_strain = mesh.strain_buffer.get(id_elem)
 
         return final_strain
 
@@ -416,58 +480,54 @@ class BaseNetCDFInstaseisDB(BaseInstaseisDB, metaclass=ABCMeta):
         xi,
         eta,
     ):
-        if id_elem not in mesh.displ_buffer:
-            utemp = np.zeros(
-                (mesh.ndumps, mesh.npol + 1, mesh.npol + 1, 3),
-                dtype=np.float64,
-                order="F",
-            )
-
-            mesh_dict = mesh.f["Snapshots"]
-
-            # Load displacement from all GLL points.
-            for i, var in enumerate(["disp_s", "disp_p", "disp_z"]):
-                if var not in mesh_dict:
-                    continue
-
-                # Make sure it can work with normal and transposed arrays to
-                # support legacy as well as modern, transposed databases.
-                time_axis = mesh.time_axis[var]
+        return self._get_displacements(
+            [mesh],
+            id_elem,
+            gll_point_ids,
+            col_points_xi,
+            col_points_eta,
+            xi,
+            eta,
+        )
 
-                # The netCDF Python wrappers starting with version 1.1.6
-                # disallow duplicate and unordered indices while slicing. So
-                # we need to do it manually.
-                # The list of ids we have is unique but not sorted.
-                ids = gll_point_ids.flatten()
-                s_ids = np.sort(ids)
+    def _get_displacements(
+        self,
+        meshes,
+        id_elem,
+        gll_point_ids,
+        col_points_xi,
+        col_points_eta,
+        xi,
+        eta,
+    ):
+        """
+        Displacement of the same element in several meshes. They are buffered
+        together in the first mesh and interpolated with a single call.
 
-                if time_axis == 0:
-                    temp = mesh_dict[var][:, s_ids]
-                    for ipol in range(mesh.npol + 1):
-                        for jpol in range(mesh.npol + 1):
-                            idx = ipol * 5 + jpol
-                            utemp[:, jpol, ipol, i] = temp[
-                                :, np.argwhere(s_ids == ids[idx])[0][0]
-                            ]
-                else:
-                    temp = mesh_dict[var][s_ids, :]
-                    for ipol in range(mesh.npol + 1):
-                        for jpol in range(mesh.npol + 1):
-                            idx = ipol * 5 + jpol
-                            utemp[:, jpol, ipol, i] = temp[
-                                np.argwhere(s_ids == ids[idx])[0][0], :
-                            ]
+        Returns an array indexed as [time, 3 * mesh + component].
+        """
+        mesh = meshes[0]
+        utemp = mesh.displ_buffer.get(id_elem)
+        if utemp is None:
+            # Buffered in the single precision of the files which halves its
+            # memory footprint - the interpolation accumulates in double
+            # precision.
+            utemp = np.empty(
+                (mesh.ndumps, mesh.npol + 1, mesh.npol + 1, 3 * len(meshes)),
+                dtype=np.float32,
+                order="F",
+            )
+            for i, m in enumerate(meshes):
+                comps = slice(3 * i, 3 * (i + 1))
+                self._read_displacement(
+                    m, gll_point_ids, utemp[:, :, :, comps]
+                )
 
             mesh.displ_buffer.add(id_elem, utemp)
-        else:
-            utemp = mesh.displ_buffer.get(id_elem)
 
-        final_displacement = np.empty((utemp.shape[0], 3), order="F")
-
-        for i in range(3):
-            final_displacement[:, i] = spectral_basis.lagrange_interpol_2D_td(
-                col_points_xi, col_points_eta, utemp[:, :, :, i], xi, eta
-            )
+        final_displacement = spectral_basis.lagrange_interpol_2D_td_batched(
+            col_points_xi, col_points_eta, utemp, xi, eta
+        )
 
         return final_displacement
 
@@ -518,7 +578,14 @@ class BaseNetCDFInstaseisDB(BaseInstaseisDB, metaclass=ABCMeta):
             dt=float(self.parsed_mesh.dt),
             sampling_rate=float(1.0 / self.parsed_mesh.dt),
             npts=int(self.parsed_mesh.ndumps),
-            nfft=int(next_pow_2(self.parsed_mesh.ndumps) * 2),
+            # Smallest fast FFT length that still leaves room for the
+            # source time shift without wrap-around.
+            nfft=int(
+                next_fast_len(
+                    2 * int(self.parsed_mesh.ndumps)
+                    + int(self.parsed_mesh.source_shift_samp)
+                )
+            ),
             length=float(self.parsed_mesh.dt * (self.parsed_mesh.ndumps - 1)),
             stf=self.parsed_mesh.stf_kind,
             src_shift=float(self.parsed_mesh.source_shift),
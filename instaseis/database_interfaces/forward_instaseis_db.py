@@ -12,6 +12,7 @@ AxiSEM.
     (http://www.gnu.org/copyleft/lgpl.html)
 """
 import collections
+import math
 import numpy as np
 
 from .base_netcdf_instaseis_db import BaseNetCDFInstaseisDB
@@ -62,33 +63,39 @@ class ForwardInstaseisDB(BaseNetCDFInstaseisDB):
         self._parse_meshes(netcdf_files)
 
     def _parse_meshes(self, files):
+        # The displacements of all four meshes are buffered together in the
+        # first one.
         m1_m = mesh.Mesh(
             files["MZZ"],
             full_parse=True,
             strain_buffer_size_in_mb=0,
-            displ_buffer_size_in_mb=self.buffer_size_in_mb,
+            displ_buffer_size_in_mb=4 * self.buffer_size_in_mb,
             read_on_demand=self.read_on_demand,
+            chunk_cache_size_in_mb=self.chunk_cache_size_in_mb,
         )
         m2_m = mesh.Mesh(
             files["MXX_P_MYY"],
             full_parse=False,
             strain_buffer_size_in_mb=0,
-            displ_buffer_size_in_mb=self.buffer_size_in_mb,
+            displ_buffer_size_in_mb=0,
             read_on_demand=self.read_on_demand,
+            chunk_cache_size_in_mb=self.chunk_cache_size_in_mb,
         )
         m3_m = mesh.Mesh(
             files["MXZ_MYZ"],
             full_parse=False,
             strain_buffer_size_in_mb=0,
-            displ_buffer_size_in_mb=self.buffer_size_in_mb,
+            displ_buffer_size_in_mb=0,
             read_on_demand=self.read_on_demand,
+            chunk_cache_size_in_mb=self.chunk_cache_size_in_mb,
         )
         m4_m = mesh.Mesh(
             files["MXY_MXX_M_MYY"],
             full_parse=False,
             strain_buffer_size_in_mb=0,
-            displ_buffer_size_in_mb=self.buffer_size_in_mb,
+            displ_buffer_size_in_mb=0,
             read_on_demand=self.read_on_demand,
+            chunk_cache_size_in_mb=self.chunk_cache_size_in_mb,
         )
         self.parsed_mesh = m1_m
 
@@ -122,8 +129,9 @@ class ForwardInstaseisDB(BaseNetCDFInstaseisDB):
         if self.info.dump_type != "displ_only":
             raise NotImplementedError
 
-        displ_1 = self._get_displacement(
-            self.meshes.m1,
+        # All four meshes are buffered together and interpolated at once.
+        displ = self._get_displacements(
+            self.meshes,
             ei.id_elem,
             ei.gll_point_ids,
             ei.col_points_xi,
@@ -131,66 +139,40 @@ class ForwardInstaseisDB(BaseNetCDFInstaseisDB):
             ei.xi,
             ei.eta,
         )
-        displ_2 = self._get_displacement(
-            self.meshes.m2,
-            ei.id_elem,
-            ei.gll_point_ids,
-            ei.col_points_xi,
-            ei.col_points_eta,
-            ei.xi,
-            ei.eta,
-        )
-        displ_3 = self._get_displacement(
-            self.meshes.m3,
-            ei.id_elem,
-            ei.gll_point_ids,
-            ei.col_points_xi,
-            ei.col_points_eta,
-            ei.xi,
-            ei.eta,
-        )
-        displ_4 = self._get_displacement(
-            self.meshes.m4,
-            ei.id_elem,
-            ei.gll_point_ids,
-            ei.col_points_xi,
-            ei.col_points_eta,
-            ei.xi,
-            ei.eta,
-        )
-
         mij = source.tensor / self.parsed_mesh.amplitude
         # mij is [m_rr, m_tt, m_pp, m_rt, m_rp, m_tp]
         # final is in s, phi, z coordinates
-        final = np.zeros((displ_1.shape[0], 3), dtype="float64")
-
-        final[:, 0] += displ_1[:, 0] * mij[0]
-        final[:, 2] += displ_1[:, 2] * mij[0]
-
-        final[:, 0] += displ_2[:, 0] * (mij[1] + mij[2])
-        final[:, 2] += displ_2[:, 2] * (mij[1] + mij[2])
-
-        fac_1 = mij[3] * np.cos(coordinates.phi) + mij[4] * np.sin(
-            coordinates.phi
-        )
-        fac_2 = -mij[3] * np.sin(coordinates.phi) + mij[4] * np.cos(
-            coordinates.phi
-        )
-
-        final[:, 0] += displ_3[:, 0] * fac_1
-        final[:, 1] += displ_3[:, 1] * fac_2
-        final[:, 2] += displ_3[:, 2] * fac_1
-
-        fac_1 = (mij[1] - mij[2]) * np.cos(2 * coordinates.phi) + 2 * mij[
-            5
-        ] * np.sin(2 * coordinates.phi)
-        fac_2 = -(mij[1] - mij[2]) * np.sin(2 * coordinates.phi) + 2 * mij[
-            5
-        ] * np.cos(2 * coordinates.phi)
 
-        final[:, 0] += displ_4[:, 0] * fac_1
-        final[:, 1] += displ_4[:, 1] * fac_2
-        final[:, 2] += displ_4[:, 2] * fac_1
+        cos_phi = math.cos(coordinates.phi)
+        sin_phi = math.sin(coordinates.phi)
+        fac_1_3 = mij[3] * cos_phi + mij[4] * sin_phi
+        fac_2_3 = -mij[3] * sin_phi + mij[4] * cos_phi
+
+        cos_2phi = math.cos(2 * coordinates.phi)
+        sin_2phi = math.sin(2 * coordinates.phi)
+        fac_1_4 = (mij[1] - mij[2]) * cos_2phi + 2 * mij[5] * sin_2phi
+        fac_2_4 = -(mij[1] - mij[2]) * sin_2phi + 2 * mij[5] * cos_2phi
+
+        # Column 3 * i + j of displ is component j of the displacement
+        # generated by the i-th mesh. Every column only contributes to its
+        # own component so all of them are weighted and summed with a single
+        # matrix product.
+        coeff = np.zeros((12, 3))
+        coeff[np.arange(12), np.tile(np.arange(3), 4)] = [
+            mij[0],
+            0.0,
+            mij[0],
+            mij[1] + mij[2],
+            0.0,
+            mij[1] + mij[2],
+            fac_1_3,
+            fac_2_3,
+            fac_1_3,
+            fac_1_4,
+            fac_2_4,
+            fac_1_4,
+        ]
+        final = displ.dot(coeff)
 
         rotmesh_colat = np.arctan2(coordinates.s, coordinates.z)
 
@@ -12,6 +12,7 @@ AxiSEM.
     (http://www.gnu.org/copyleft/lgpl.html)
 """
 import collections
+import math
 import numpy as np
 
 from .base_netcdf_instaseis_db import BaseNetCDFInstaseisDB
@@ -74,6 +75,7 @@ class ForwardMergedInstaseisDB(BaseNetCDFInstaseisDB):
                 strain_buffer_size_in_mb=self.buffer_size_in_mb,
                 displ_buffer_size_in_mb=self.buffer_size_in_mb,
                 read_on_demand=self.read_on_demand,
+                chunk_cache_size_in_mb=self.chunk_cache_size_in_mb,
             )
         )
         self.parsed_mesh = self.meshes.merged
@@ -104,138 +106,56 @@ class ForwardMergedInstaseisDB(BaseNetCDFInstaseisDB):
             raise NotImplementedError
 
         # Get from netcdf file or buffer.
-        if ei.id_elem not in self.parsed_mesh.displ_buffer:
+        utemp = self.parsed_mesh.displ_buffer.get(ei.id_elem)
+        if utemp is None:
             utemp = self.meshes.merged.f["MergedSnapshots"][ei.id_elem]
 
-            # utemp is currently (nvars, jpol, ipol, npts)
-            # 1. Roll to (npts, nvar, jpol, ipol)
-            utemp = np.rollaxis(utemp, 3, 0)
-            # 2. Roll to (npts, jpol, nvar, ipol)
-            utemp = np.rollaxis(utemp, 2, 1)
-            # 3. Roll to (npts, jpol, ipol, nvar)
-            utemp = np.rollaxis(utemp, 3, 2)
+            # utemp is currently (nvars, jpol, ipol, npts) - permute to
+            # (npts, jpol, ipol, nvar) in one go. It is stored in Fortran
+            # order once so it does not have to be copied again by the
+            # Fortran routines every time it is taken from the buffer.
+            utemp = np.asfortranarray(utemp.transpose(3, 1, 2, 0))
 
             self.parsed_mesh.displ_buffer.add(ei.id_elem, utemp)
-        else:
-            utemp = self.parsed_mesh.displ_buffer.get(ei.id_elem)
-
-        displ_1 = np.zeros((utemp.shape[0], 3), order="F")
-        displ_2 = np.zeros((utemp.shape[0], 3), order="F")
-        displ_3 = np.zeros((utemp.shape[0], 3), order="F")
-        displ_4 = np.zeros((utemp.shape[0], 3), order="F")
 
-        # Now just fill them all.
-        # displ_1 is generated from MZZ which has only two displacement
-        # components.
-        displ_1[:, 0] = spectral_basis.lagrange_interpol_2D_td(
-            points1=ei.col_points_xi,
-            points2=ei.col_points_eta,
-            coefficients=utemp[:, :, :, 0],
-            x1=ei.xi,
-            x2=ei.eta,
-        )
-        displ_1[:, 2] = spectral_basis.lagrange_interpol_2D_td(
-            points1=ei.col_points_xi,
-            points2=ei.col_points_eta,
-            coefficients=utemp[:, :, :, 1],
-            x1=ei.xi,
-            x2=ei.eta,
-        )
-        # displ_2 is generated from MXX+MYY which has only two displacement
-        # components.
-        displ_2[:, 0] = spectral_basis.lagrange_interpol_2D_td(
-            points1=ei.col_points_xi,
-            points2=ei.col_points_eta,
-            coefficients=utemp[:, :, :, 2],
-            x1=ei.xi,
-            x2=ei.eta,
-        )
-        displ_2[:, 2] = spectral_basis.lagrange_interpol_2D_td(
-            points1=ei.col_points_xi,
-            points2=ei.col_points_eta,
-            coefficients=utemp[:, :, :, 3],
-            x1=ei.xi,
-            x2=ei.eta,
-        )
-        # displ_3 is generated from MXZ/MYZ which has three displacement
-        # components.
-        displ_3[:, 0] = spectral_basis.lagrange_interpol_2D_td(
-            points1=ei.col_points_xi,
-            points2=ei.col_points_eta,
-            coefficients=utemp[:, :, :, 4],
-            x1=ei.xi,
-            x2=ei.eta,
-        )
-        displ_3[:, 1] = spectral_basis.lagrange_interpol_2D_td(
-            points1=ei.col_points_xi,
-            points2=ei.col_points_eta,
-            coefficients=utemp[:, :, :, 5],
-            x1=ei.xi,
-            x2=ei.eta,
-        )
-        displ_3[:, 2] = spectral_basis.lagrange_interpol_2D_td(
-            points1=ei.col_points_xi,
-            points2=ei.col_points_eta,
-            coefficients=utemp[:, :, :, 6],
-            x1=ei.xi,
-            x2=ei.eta,
-        )
-        # displ_3 is generated from MXY/MXX-MYY which has three displacement
-        # components.
-        displ_4[:, 0] = spectral_basis.lagrange_interpol_2D_td(
-            points1=ei.col_points_xi,
-            points2=ei.col_points_eta,
-            coefficients=utemp[:, :, :, 7],
-            x1=ei.xi,
-            x2=ei.eta,
-        )
-        displ_4[:, 1] = spectral_basis.lagrange_interpol_2D_td(
-            points1=ei.col_points_xi,
-            points2=ei.col_points_eta,
-            coefficients=utemp[:, :, :, 8],
-            x1=ei.xi,
-            x2=ei.eta,
-        )
-        displ_4[:, 2] = spectral_basis.lagrange_interpol_2D_td(
-            points1=ei.col_points_xi,
-            points2=ei.col_points_eta,
-            coefficients=utemp[:, :, :, 9],
-            x1=ei.xi,
-            x2=ei.eta,
+        # Interpolate all ten displacement fields at once.
+        displ = spectral_basis.lagrange_interpol_2D_td_batched(
+            ei.col_points_xi, ei.col_points_eta, utemp, ei.xi, ei.eta
         )
 
         mij = source.tensor / self.parsed_mesh.amplitude
         # mij is [m_rr, m_tt, m_pp, m_rt, m_rp, m_tp]
         # final is in s, phi, z coordinates
-        final = np.zeros((displ_1.shape[0], 3), dtype="float64")
-
-        final[:, 0] += displ_1[:, 0] * mij[0]
-        final[:, 2] += displ_1[:, 2] * mij[0]
-
-        final[:, 0] += displ_2[:, 0] * (mij[1] + mij[2])
-        final[:, 2] += displ_2[:, 2] * (mij[1] + mij[2])
-
-        fac_1 = mij[3] * np.cos(coordinates.phi) + mij[4] * np.sin(
-            coordinates.phi
-        )
-        fac_2 = -mij[3] * np.sin(coordinates.phi) + mij[4] * np.cos(
-            coordinates.phi
-        )
-
-        final[:, 0] += displ_3[:, 0] * fac_1
-        final[:, 1] += displ_3[:, 1] * fac_2
-        final[:, 2] += displ_3[:, 2] * fac_1
-
-        fac_1 = (mij[1] - mij[2]) * np.cos(2 * coordinates.phi) + 2 * mij[
-            5
-        ] * np.sin(2 * coordinates.phi)
-        fac_2 = -(mij[1] - mij[2]) * np.sin(2 * coordinates.phi) + 2 * mij[
-            5
-        ] * np.cos(2 * coordinates.phi)
 
-        final[:, 0] += displ_4[:, 0] * fac_1
-        final[:, 1] += displ_4[:, 1] * fac_2
-        final[:, 2] += displ_4[:, 2] * fac_1
+        cos_phi = math.cos(coordinates.phi)
+        sin_phi = math.sin(coordinates.phi)
+        fac_1_3 = mij[3] * cos_phi + mij[4] * sin_phi
+        fac_2_3 = -mij[3] * sin_phi + mij[4] * cos_phi
+
+        cos_2phi = math.cos(2 * coordinates.phi)
+        sin_2phi = math.sin(2 * coordinates.phi)
+        fac_1_4 = (mij[1] - mij[2]) * cos_2phi + 2 * mij[5] * sin_2phi
+        fac_2_4 = -(mij[1] - mij[2]) * sin_2phi + 2 * mij[5] * cos_2phi
+
+        # The displacements generated from MZZ (columns 0 and 1) and MXX+MYY
+        # (columns 2 and 3) only have s and z components, the ones from
+        # MXZ/MYZ (columns 4 to 6) and MXY/MXX-MYY (columns 7 to 9) have all
+        # three. Every column only contributes to its own component so all of
+        # them are weighted and summed with a single matrix product.
+        coeff = np.zeros((10, 3))
+        coeff[np.arange(10), [0, 2, 0, 2, 0, 1, 2, 0, 1, 2]] = [
+            mij[0],
+            mij[0],
+            mij[1] + mij[2],
+            mij[1] + mij[2],
+            fac_1_3,
+            fac_2_3,
+            fac_1_3,
+            fac_1_4,
+            fac_2_4,
+            fac_1_4,
+        ]
+        final = displ.dot(coeff)
 
         rotmesh_colat = np.arctan2(coordinates.s, coordinates.z)
 
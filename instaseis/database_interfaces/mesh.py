@@ -22,6 +22,7 @@ instead of
     (http://www.gnu.org/copyleft/lgpl.html)
 """
 from collections import OrderedDict
+import threading
 
 import h5py
 import numpy as np
@@ -29,12 +30,22 @@ from obspy import UTCDateTime
 from scipy.spatial import cKDTree
 
 
+# Number of hash table slots of the HDF5 chunk cache. The HDF5 documentation
+# recommends a prime number much larger than the number of chunks that fit
+# into the cache.
+CHUNK_CACHE_NSLOTS = 100003
+
+
 class Buffer(object):
     """
     A simple memory-limited buffer with a dictionary-like interface.
     Implemented as a kind of priority queue where priority is highest for
     recently accessed items. Thus the "stalest" items are removed first once
     the memory limit it reached.
+
+    It can be shared between threads. Use get() which looks up an item and
+    marks it as recently used in one go - another thread might remove it
+    between a membership test and a subsequent call to get().
     """
 
     def __init__(self, max_size_in_mb=100):
@@ -43,23 +54,31 @@ class Buffer(object):
         self._buffer = OrderedDict()
         self._hits = 0
         self._fails = 0
+        self._lock = threading.Lock()
 
     def __contains__(self, key):
-        contains = key in self._buffer
-        if contains:
-            self._hits += 1
-        else:
-            self._fails += 1
+        with self._lock:
+            contains = key in self._buffer
+            if contains:
+                self._hits += 1
+            else:
+                self._fails += 1
         return contains
 
-    def get(self, key):
+    def get(self, key, default=None):
         """
         Return an item from the buffer and move it to the end, so it is removed
-        last.
+        last. Returns default if the item is not in the buffer.
         """
-        value = self._buffer.pop(key)
-        self._buffer[key] = value
-        return value
+        with self._lock:
+            try:
+                value = self._buffer[key]
+            except KeyError:
+                self._fails += 1
+                return default
+            self._hits += 1
+            self._buffer.move_to_end(key)
+            return value
 
     def _get_nbytes(self, value):
         # Works with single arrays and iterables of arrays.
@@ -73,14 +92,18 @@ class Buffer(object):
         Add an item to the buffer and make sure that the buffer does not exceed
         the maximum size in memory.
         """
-        self._buffer[key] = value
-        # Assuming value is a numpy array
-        self._total_size += self._get_nbytes(value)
-
-        # Remove existing values, until the size limit is fulfilled.
-        while self._total_size > self._max_size_in_bytes:
-            _, v = self._buffer.popitem(last=False)
-            self._total_size -= self._get_nbytes(v)
+        with self._lock:
+            # Another thread might have added the same item in the meanwhile.
+            if key in self._buffer:
+                self._total_size -= self._get_nbytes(self._buffer.pop(key))
+            self._buffer[key] = value
+            # Assuming value is a numpy array
+            self._total_size += self._get_nbytes(value)
+
+            # Remove existing values, until the size limit is fulfilled.
+            while self._total_size > self._max_size_in_bytes:
+                _, v = self._buffer.popitem(last=False)
+                self._total_size -= self._get_nbytes(v)
 
     def get_size_mb(self):
         return float(self._total_size) / 1024 ** 2
@@ -88,8 +111,8 @@ class Buffer(object):
     @property
     def efficiency(self):
         """
-        Return the fraction of calls to the __contains__() routine that
-        returned True.
+        Return the fraction of calls to the __contains__() and get() routines
+        that found the item.
         """
         if (self._hits + self._fails) == 0:
             return 0.0
@@ -133,14 +156,43 @@ class Mesh(object):
         strain_buffer_size_in_mb=0,
         displ_buffer_size_in_mb=0,
         read_on_demand=True,
+        chunk_cache_size_in_mb=None,
     ):
-        self.f = h5py.File(filename, "r")
+        if chunk_cache_size_in_mb is None:
+            self.f = h5py.File(filename, "r")
+        else:
+            self.f = h5py.File(
+                filename,
+                "r",
+                rdcc_nbytes=int(chunk_cache_size_in_mb * 1024 ** 2),
+                rdcc_nslots=CHUNK_CACHE_NSLOTS,
+            )
         self.filename = filename
         self.read_on_demand = read_on_demand
         self._parse(full_parse=full_parse)
         self._find_time_axis()
         self.strain_buffer = Buffer(strain_buffer_size_in_mb)
         self.displ_buffer = Buffer(displ_buffer_size_in_mb)
+        # Scratch arrays are per thread as the server extracts seismograms
+        # from the same mesh in several threads.
+        self._scratch = threading.local()
+
+    def get_utemp_scratch(self):
+        """
+        Reusable array for the displacement at the GLL points of one element.
+
+        Its content is overwritten by every user so it must not be stored.
+        """
+        try:
+            return self._scratch.utemp
+        except AttributeError:
+            pass
+        self._scratch.utemp = np.empty(
+            (self.ndumps, self.npol + 1, self.npol + 1, 3),
+            dtype=np.float64,
+            order="F",
+        )
+        return self._scratch.utemp
 
     def _get_str_attr(self, name):
         attr = self.f.attrs[name]
@@ -161,6 +213,13 @@ class Mesh(object):
             if "stf" not in key:
                 self.time_axis[key] = get_time_axis(value, self.ndumps)
         else:
+            # Keep the handles of the displacement datasets so they do not
+            # have to be looked up again for every element.
+            self.displacement_datasets = [
+                (i, self.f["Snapshots"][var], self.time_axis[var])
+                for i, var in enumerate(["disp_s", "disp_p", "disp_z"])
+                if var in self.time_axis
+            ]
             return
         raise NotImplementedError  # pragma: no cover
 
@@ -310,17 +369,57 @@ class Mesh(object):
 
             self.kdtree = cKDTree(data=self.mesh)
 
+            # The element geometry is needed for every element search. It is
+            # small compared to the wavefields and thus always kept in
+            # memory.
+            self.fem_mesh = self.f["Mesh"]["fem_mesh"][:]
+            self.eltypes = self.f["Mesh"]["eltype"][:]
+            self.mesh_S = self.f["Mesh"]["mesh_S"][:]
+            self.mesh_Z = self.f["Mesh"]["mesh_Z"][:]
+            self.axis = self.f["Mesh"]["axis"][:]
+
+            # Corner points of all elements so testing a candidate element
+            # does not have to gather them again. Stored as [elem, (s, z),
+            # corner] so the transpose for a single element is the Fortran
+            # ordered (4, 2) array the wrappers expect.
+            corner_ids = self.fem_mesh[:, :4]
+            self.element_corners = np.empty(
+                (corner_ids.shape[0], 2, 4), dtype=np.float64
+            )
+            self.element_corners[:, 0] = self.mesh_S[corner_ids]
+            self.element_corners[:, 1] = self.mesh_Z[corner_ids]
+
+            # Axis-aligned bounding boxes of all elements as (s_min, s_max,
+            # z_min, z_max) to cheaply reject candidate elements. They are
+            # padded to account for curved element edges and the tolerances
+            # used to find the element.
+            corners_s = self.element_corners[:, 0]
+            corners_z = self.element_corners[:, 1]
+            self.element_bbox = np.array(
+                [
+                    corners_s.min(axis=1),
+                    corners_s.max(axis=1),
+                    corners_z.min(axis=1),
+                    corners_z.max(axis=1),
+                ]
+            )
+            pad = 0.25 * np.maximum(
+                self.element_bbox[1] - self.element_bbox[0],
+                self.element_bbox[3] - self.element_bbox[2],
+            )
+            self.element_bbox[0::2] -= pad
+            self.element_bbox[1::2] += pad
+
             # Store some more index types in memory. While this increases
             # memory use it should be acceptable and result in much less netCDF
             # reads.
             if not self.read_on_demand:
-                self.fem_mesh = self.f["Mesh"]["fem_mesh"][:]
-                self.eltypes = self.f["Mesh"]["eltype"][:]
-                self.mesh_S = self.f["Mesh"]["mesh_S"][:]
-                self.mesh_Z = self.f["Mesh"]["mesh_Z"][:]
                 self.sem_mesh = self.f["Mesh"]["sem_mesh"][:]
-                self.axis = self.f["Mesh"]["axis"][:]
                 self.mesh_mu = self.f["Mesh"]["mesh_mu"][:]
+            else:
+                # Otherwise keep the GLL point ids of recently found
+                # elements around.
+                self.gll_point_ids_buffer = Buffer(max_size_in_mb=1)
 
         elif self.dump_type == "fullfields" or self.dump_type == "strain_only":
             # Build a kdtree of the stored gll points.
@@ -12,6 +12,7 @@ AxiSEM.
     (http://www.gnu.org/copyleft/lgpl.html)
 """
 import collections
+import math
 import numpy as np
 
 from .base_netcdf_instaseis_db import BaseNetCDFInstaseisDB
@@ -81,6 +82,7 @@ class ReciprocalInstaseisDB(BaseNetCDFInstaseisDB):
                 strain_buffer_size_in_mb=self.buffer_size_in_mb,
                 displ_buffer_size_in_mb=self.buffer_size_in_mb,
                 read_on_demand=self.read_on_demand,
+                chunk_cache_size_in_mb=self.chunk_cache_size_in_mb,
             )
             pz_m = mesh.Mesh(
                 pz_file,
@@ -88,6 +90,7 @@ class ReciprocalInstaseisDB(BaseNetCDFInstaseisDB):
                 strain_buffer_size_in_mb=self.buffer_size_in_mb,
                 displ_buffer_size_in_mb=self.buffer_size_in_mb,
                 read_on_demand=self.read_on_demand,
+                chunk_cache_size_in_mb=self.chunk_cache_size_in_mb,
             )
             self.parsed_mesh = px_m
         elif x_exists:
@@ -97,6 +100,7 @@ class ReciprocalInstaseisDB(BaseNetCDFInstaseisDB):
                 strain_buffer_size_in_mb=self.buffer_size_in_mb,
                 displ_buffer_size_in_mb=self.buffer_size_in_mb,
                 read_on_demand=self.read_on_demand,
+                chunk_cache_size_in_mb=self.chunk_cache_size_in_mb,
             )
             pz_m = None
             self.parsed_mesh = px_m
@@ -108,6 +112,7 @@ class ReciprocalInstaseisDB(BaseNetCDFInstaseisDB):
                 strain_buffer_size_in_mb=self.buffer_size_in_mb,
                 displ_buffer_size_in_mb=self.buffer_size_in_mb,
                 read_on_demand=self.read_on_demand,
+                chunk_cache_size_in_mb=self.chunk_cache_size_in_mb,
             )
             self.parsed_mesh = pz_m
         else:
@@ -143,8 +148,9 @@ class ReciprocalInstaseisDB(BaseNetCDFInstaseisDB):
             mu = mesh_mu[ei.id_elem]
         data["mu"] = mu
 
-        fac_1_map = {"N": np.cos, "E": np.sin}
-        fac_2_map = {"N": lambda x: -np.sin(x), "E": np.cos}
+        # Trigonometric factors shared by the N and E components.
+        cos_phi = math.cos(coordinates.phi)
+        sin_phi = math.sin(coordinates.phi)
 
         if isinstance(source, Source):
             if self.info.dump_type == "displ_only":
@@ -203,59 +209,73 @@ class ReciprocalInstaseisDB(BaseNetCDFInstaseisDB):
                 ):
                     strain_x = self._get_strain(self.meshes.px, ei.id_elem)
 
-            mij = rotations.rotate_symm_tensor_voigt_xyz_src_to_xyz_earth(
+            mij = rotations.rotate_symm_tensor_voigt_xyz_src_to_mesh(
                 source.tensor_voigt,
-                np.deg2rad(source.longitude),
-                np.deg2rad(source.colatitude),
-            )
-            mij = rotations.rotate_symm_tensor_voigt_xyz_earth_to_xyz_src(
-                mij,
-                np.deg2rad(receiver.longitude),
-                np.deg2rad(receiver.colatitude),
-            )
-            mij = rotations.rotate_symm_tensor_voigt_xyz_to_src(
-                mij, coordinates.phi
+                source.longitude_rad,
+                source.colatitude_rad,
+                receiver.longitude_rad,
+                receiver.colatitude_rad,
+                coordinates.phi,
             )
             mij /= self.parsed_mesh.amplitude
 
+            # Each component is a linear combination of the strain
+            # components. Assemble the coefficients so all components can be
+            # computed with a single matrix product.
             if "Z" in components:
-                final = np.zeros(strain_z.shape[0], dtype="float64")
-                for i in range(3):
-                    final += mij[i] * strain_z[:, i]
-                final += 2.0 * mij[4] * strain_z[:, 4]
-                data["Z"] = final
-
-            if "R" in components:
-                final = np.zeros(strain_x.shape[0], dtype="float64")
-                final -= strain_x[:, 0] * mij[0] * 1.0
-                final -= strain_x[:, 1] * mij[1] * 1.0
-                final -= strain_x[:, 2] * mij[2] * 1.0
-                final -= strain_x[:, 4] * mij[4] * 2.0
-                data["R"] = final
-
-            if "T" in components:
-                final = np.zeros(strain_x.shape[0], dtype="float64")
-                final += strain_x[:, 3] * mij[3] * 2.0
-                final += strain_x[:, 5] * mij[5] * 2.0
-                data["T"] = final
-
-            for comp in ["E", "N"]:
-                if comp not in components:
-                    continue
-
-                fac_1 = fac_1_map[comp](coordinates.phi)
-                fac_2 = fac_2_map[comp](coordinates.phi)
-
-                final = np.zeros(strain_x.shape[0], dtype="float64")
-                final += strain_x[:, 0] * mij[0] * 1.0 * fac_1
-                final += strain_x[:, 1] * mij[1] * 1.0 * fac_1
-                final += strain_x[:, 2] * mij[2] * 1.0 * fac_1
-                final += strain_x[:, 3] * mij[3] * 2.0 * fac_2
-                final += strain_x[:, 4] * mij[4] * 2.0 * fac_1
-                final += strain_x[:, 5] * mij[5] * 2.0 * fac_2
-                if comp == "N":
-                    final *= -1.0
-                data[comp] = final
+                coeff_z = np.array(
+                    [mij[0], mij[1], mij[2], 0.0, 2.0 * mij[4], 0.0],
+                    dtype=strain_z.dtype,
+                )
+                data["Z"] = strain_z.dot(coeff_z)
+
+            x_components = [
+                comp for comp in ["R", "T", "E", "N"] if comp in components
+            ]
+            if x_components:
+                coeff_x = np.empty(
+                    (len(x_components), 6), dtype=strain_x.dtype
+                )
+                for i, comp in enumerate(x_components):
+                    if comp == "R":
+                        coeff_x[i] = [
+                            -mij[0],
+                            -mij[1],
+                            -mij[2],
+                            0.0,
+                            -2.0 * mij[4],
+                            0.0,
+                        ]
+                    elif comp == "T":
+                        coeff_x[i] = [
+                            0.0,
+                            0.0,
+                            0.0,
+                            2.0 * mij[3],
+                            0.0,
+                            2.0 * mij[5],
+                        ]
+                    else:
+                        if comp == "N":
+                            fac_1, fac_2 = cos_phi, -sin_phi
+                        else:
+                            fac_1, fac_2 = sin_phi, cos_phi
+                        coeff_x[i] = [
+                            mij[0] * fac_1,
+                            mij[1] * fac_1,
+                            mij[2] * fac_1,
+                            2.0 * mij[3] * fac_2,
+                            2.0 * mij[4] * fac_1,
+                            2.0 * mij[5] * fac_2,
+                        ]
+                        if comp == "N":
+                            coeff_x[i] *= -1.0
+
+                # Results in a C-contiguous array so every component is
+                # contiguous in memory.
+                final = coeff_x.dot(strain_x.T)
+                for i, comp in enumerate(x_components):
+                    data[comp] = final[i]
 
         elif isinstance(source, ForceSource):
             if self.info.dump_type != "displ_only":
@@ -283,50 +303,49 @@ class ReciprocalInstaseisDB(BaseNetCDFInstaseisDB):
                     ei.eta,
                 )
 
-            force = rotations.rotate_vector_xyz_src_to_xyz_earth(
+            force = rotations.rotate_vector_xyz_src_to_mesh(
                 source.force_tpr,
-                np.deg2rad(source.longitude),
-                np.deg2rad(source.colatitude),
-            )
-            force = rotations.rotate_vector_xyz_earth_to_xyz_src(
-                force,
-                np.deg2rad(receiver.longitude),
-                np.deg2rad(receiver.colatitude),
+                source.longitude_rad,
+                source.colatitude_rad,
+                receiver.longitude_rad,
+                receiver.colatitude_rad,
+                coordinates.phi,
             )
-            force = rotations.rotate_vector_xyz_to_src(force, coordinates.phi)
             force /= self.parsed_mesh.amplitude
 
+            # Same as for moment tensor sources: a single matrix product
+            # for all components.
             if "Z" in components:
-                final = np.zeros(displ_z.shape[0], dtype="float64")
-                final += displ_z[:, 0] * force[0]
-                final += displ_z[:, 2] * force[2]
-                data["Z"] = final
-
-            if "R" in components:
-                final = np.zeros(displ_x.shape[0], dtype="float64")
-                final += displ_x[:, 0] * force[0]
-                final += displ_x[:, 2] * force[2]
-                data["R"] = final
-
-            if "T" in components:
-                final = np.zeros(displ_x.shape[0], dtype="float64")
-                final += displ_x[:, 1] * force[1]
-                data["T"] = final
-
-            for comp in ["E", "N"]:
-                if comp not in components:
-                    continue
-
-                fac_1 = fac_1_map[comp](coordinates.phi)
-                fac_2 = fac_2_map[comp](coordinates.phi)
-
-                final = np.zeros(displ_x.shape[0], dtype="float64")
-                final += displ_x[:, 0] * force[0] * fac_1
-                final += displ_x[:, 1] * force[1] * fac_2
-                final += displ_x[:, 2] * force[2] * fac_1
-                if comp == "N":
-                    final *= -1.0
-                data[comp] = final
+                # The phi-displacement does not contribute to the vertical
+                # component so only the s and z columns are used.
+                data["Z"] = displ_z[:, ::2].dot(force[::2])
+
+            x_components = [
+                comp for comp in ["R", "T", "E", "N"] if comp in components
+            ]
+            if x_components:
+                coeff_x = np.empty((len(x_components), 3), dtype=np.float64)
+                for i, comp in enumerate(x_components):
+                    if comp == "R":
+                        coeff_x[i] = [force[0], 0.0, force[2]]
+                    elif comp == "T":
+                        coeff_x[i] = [0.0, force[1], 0.0]
+                    else:
+                        if comp == "N":
+                            fac_1, fac_2 = cos_phi, -sin_phi
+                        else:
+                            fac_1, fac_2 = sin_phi, cos_phi
+                        coeff_x[i] = [
+                            force[0] * fac_1,
+                            force[1] * fac_2,
+                            force[2] * fac_1,
+                        ]
+                        if comp == "N":
+                            coeff_x[i] *= -1.0
+
+                final = coeff_x.dot(displ_x.T)
+                for i, comp in enumerate(x_components):
+                    data[comp] = final[i]
 
         else:
             raise NotImplementedError
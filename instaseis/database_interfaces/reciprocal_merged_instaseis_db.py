@@ -12,11 +12,12 @@ AxiSEM.
     (http://www.gnu.org/copyleft/lgpl.html)
 """
 import collections
+import math
 import numpy as np
 
-from .base_netcdf_instaseis_db import BaseNetCDFInstaseisDB
+from .base_netcdf_instaseis_db import BaseNetCDFInstaseisDB, STRAIN_FCT_MAP
 from . import mesh
-from .. import rotations, sem_derivatives, spectral_basis
+from .. import rotations, spectral_basis
 from ..source import Source, ForceSource
 
 
@@ -74,6 +75,7 @@ class ReciprocalMergedInstaseisDB(BaseNetCDFInstaseisDB):
                 strain_buffer_size_in_mb=self.buffer_size_in_mb,
                 displ_buffer_size_in_mb=self.buffer_size_in_mb,
                 read_on_demand=self.read_on_demand,
+                chunk_cache_size_in_mb=self.chunk_cache_size_in_mb,
             )
         )
         self.parsed_mesh = self.meshes.merged
@@ -105,8 +107,9 @@ class ReciprocalMergedInstaseisDB(BaseNetCDFInstaseisDB):
             mu = mesh_mu[ei.id_elem]
         data["mu"] = mu
 
-        fac_1_map = {"N": np.cos, "E": np.sin}
-        fac_2_map = {"N": lambda x: -np.sin(x), "E": np.cos}
+        # Trigonometric factors shared by the N and E components.
+        cos_phi = math.cos(coordinates.phi)
+        sin_phi = math.sin(coordinates.phi)
 
         if isinstance(source, Source):
             if self.info.dump_type == "displ_only":
@@ -139,59 +142,73 @@ class ReciprocalMergedInstaseisDB(BaseNetCDFInstaseisDB):
                 # non-displacement databases.
                 raise NotImplementedError
 
-            mij = rotations.rotate_symm_tensor_voigt_xyz_src_to_xyz_earth(
+            mij = rotations.rotate_symm_tensor_voigt_xyz_src_to_mesh(
                 source.tensor_voigt,
-                np.deg2rad(source.longitude),
-                np.deg2rad(source.colatitude),
-            )
-            mij = rotations.rotate_symm_tensor_voigt_xyz_earth_to_xyz_src(
-                mij,
-                np.deg2rad(receiver.longitude),
-                np.deg2rad(receiver.colatitude),
-            )
-            mij = rotations.rotate_symm_tensor_voigt_xyz_to_src(
-                mij, coordinates.phi
+                source.longitude_rad,
+                source.colatitude_rad,
+                receiver.longitude_rad,
+                receiver.colatitude_rad,
+                coordinates.phi,
             )
             mij /= self.parsed_mesh.amplitude
 
+            # Each component is a linear combination of the strain
+            # components. Assemble the coefficients so all components can be
+            # computed with a single matrix product.
             if "Z" in components:
-                final = np.zeros(strain_z.shape[0], dtype="float64")
-                for i in range(3):
-                    final += mij[i] * strain_z[:, i]
-                final += 2.0 * mij[4] * strain_z[:, 4]
-                data["Z"] = final
-
-            if "R" in components:
-                final = np.zeros(strain_x.shape[0], dtype="float64")
-                final -= strain_x[:, 0] * mij[0] * 1.0
-                final -= strain_x[:, 1] * mij[1] * 1.0
-                final -= strain_x[:, 2] * mij[2] * 1.0
-                final -= strain_x[:, 4] * mij[4] * 2.0
-                data["R"] = final
-
-            if "T" in components:
-                final = np.zeros(strain_x.shape[0], dtype="float64")
-                final += strain_x[:, 3] * mij[3] * 2.0
-                final += strain_x[:, 5] * mij[5] * 2.0
-                data["T"] = final
-
-            for comp in ["E", "N"]:
-                if comp not in components:
-                    continue
-
-                fac_1 = fac_1_map[comp](coordinates.phi)
-                fac_2 = fac_2_map[comp](coordinates.phi)
-
-                final = np.zeros(strain_x.shape[0], dtype="float64")
-                final += strain_x[:, 0] * mij[0] * 1.0 * fac_1
-                final += strain_x[:, 1] * mij[1] * 1.0 * fac_1
-                final += strain_x[:, 2] * mij[2] * 1.0 * fac_1
-                final += strain_x[:, 3] * mij[3] * 2.0 * fac_2
-                final += strain_x[:, 4] * mij[4] * 2.0 * fac_1
-                final += strain_x[:, 5] * mij[5] * 2.0 * fac_2
-                if comp == "N":
-                    final *= -1.0
-                data[comp] = final
+                coeff_z = np.array(
+                    [mij[0], mij[1], mij[2], 0.0, 2.0 * mij[4], 0.0],
+                    dtype=strain_z.dtype,
+                )
+                data["Z"] = strain_z.dot(coeff_z)
+
+            x_components = [
+                comp for comp in ["R", "T", "E", "N"] if comp in components
+            ]
+            if x_components:
+                coeff_x = np.empty(
+                    (len(x_components), 6), dtype=strain_x.dtype
+                )
+                for i, comp in enumerate(x_components):
+                    if comp == "R":
+                        coeff_x[i] = [
+                            -mij[0],
+                            -mij[1],
+                            -mij[2],
+                            0.0,
+                            -2.0 * mij[4],
+                            0.0,
+                        ]
+                    elif comp == "T":
+                        coeff_x[i] = [
+                            0.0,
+                            0.0,
+                            0.0,
+                            2.0 * mij[3],
+                            0.0,
+                            2.0 * mij[5],
+                        ]
+                    else:
+                        if comp == "N":
+                            fac_1, fac_2 = cos_phi, -sin_phi
+                        else:
+                            fac_1, fac_2 = sin_phi, cos_phi
+                        coeff_x[i] = [
+                            mij[0] * fac_1,
+                            mij[1] * fac_1,
+                            mij[2] * fac_1,
+                            2.0 * mij[3] * fac_2,
+                            2.0 * mij[4] * fac_1,
+                            2.0 * mij[5] * fac_2,
+                        ]
+                        if comp == "N":
+                            coeff_x[i] *= -1.0
+
+                # Results in a C-contiguous array so every component is
+                # contiguous in memory.
+                final = coeff_x.dot(strain_x.T)
+                for i, comp in enumerate(x_components):
+                    data[comp] = final[i]
 
         elif isinstance(source, ForceSource):
             if self.info.dump_type != "displ_only":  # pragma: no cover
@@ -209,50 +226,49 @@ class ReciprocalMergedInstaseisDB(BaseNetCDFInstaseisDB):
                 ei.eta,
             )
 
-            force = rotations.rotate_vector_xyz_src_to_xyz_earth(
+            force = rotations.rotate_vector_xyz_src_to_mesh(
                 source.force_tpr,
-                np.deg2rad(source.longitude),
-                np.deg2rad(source.colatitude),
-            )
-            force = rotations.rotate_vector_xyz_earth_to_xyz_src(
-                force,
-                np.deg2rad(receiver.longitude),
-                np.deg2rad(receiver.colatitude),
+                source.longitude_rad,
+                source.colatitude_rad,
+                receiver.longitude_rad,
+                receiver.colatitude_rad,
+                coordinates.phi,
             )
-            force = rotations.rotate_vector_xyz_to_src(force, coordinates.phi)
             force /= self.parsed_mesh.amplitude
 
+            # Same as for moment tensor sources: a single matrix product
+            # for all components.
             if "Z" in components:
-                final = np.zeros(displ_z.shape[0], dtype="float64")
-                final += displ_z[:, 0] * force[0]
-                final += displ_z[:, 2] * force[2]
-                data["Z"] = final
-
-            if "R" in components:
-                final = np.zeros(displ_x.shape[0], dtype="float64")
-                final += displ_x[:, 0] * force[0]
-                final += displ_x[:, 2] * force[2]
-                data["R"] = final
-
-            if "T" in components:
-                final = np.zeros(displ_x.shape[0], dtype="float64")
-                final += displ_x[:, 1] * force[1]
-                data["T"] = final
-
-            for comp in ["E", "N"]:
-                if comp not in components:
-                    continue
-
-                fac_1 = fac_1_map[comp](coordinates.phi)
-                fac_2 = fac_2_map[comp](coordinates.phi)
-
-                final = np.zeros(displ_x.shape[0], dtype="float64")
-                final += displ_x[:, 0] * force[0] * fac_1
-                final += displ_x[:, 1] * force[1] * fac_2
-                final += displ_x[:, 2] * force[2] * fac_1
-                if comp == "N":
-                    final *= -1.0
-                data[comp] = final
+                # The phi-displacement does not contribute to the vertical
+                # component so only the s and z columns are used.
+                data["Z"] = displ_z[:, ::2].dot(force[::2])
+
+            x_components = [
+                comp for comp in ["R", "T", "E", "N"] if comp in components
+            ]
+            if x_components:
+                coeff_x = np.empty((len(x_components), 3), dtype=np.float64)
+                for i, comp in enumerate(x_components):
+                    if comp == "R":
+                        coeff_x[i] = [force[0], 0.0, force[2]]
+                    elif comp == "T":
+                        coeff_x[i] = [0.0, force[1], 0.0]
+                    else:
+                        if comp == "N":
+                            fac_1, fac_2 = cos_phi, -sin_phi
+                        else:
+                            fac_1, fac_2 = sin_phi, cos_phi
+                        coeff_x[i] = [
+                            force[0] * fac_1,
+                            force[1] * fac_2,
+                            force[2] * fac_1,
+                        ]
+                        if comp == "N":
+                            coeff_x[i] *= -1.0
+
+                final = coeff_x.dot(displ_x.T)
+                for i, comp in enumerate(x_components):
+                    data[comp] = final[i]
 
         else:
             raise NotImplementedError
@@ -263,15 +279,11 @@ class ReciprocalMergedInstaseisDB(BaseNetCDFInstaseisDB):
         # We can now read it in a single go!
         utemp = self.meshes.merged.f["MergedSnapshots"][id_elem]
 
-        # utemp is currently (nvars, jpol, ipol, npts)
-        # 1. Roll to (npts, nvar, jpol, ipol)
-        utemp = np.rollaxis(utemp, 3, 0)
-        # 2. Roll to (npts, jpol, nvar, ipol)
-        utemp = np.rollaxis(utemp, 2, 1)
-        # 3. Roll to (npts, jpol, ipol, nvar)
-        utemp = np.rollaxis(utemp, 3, 2)
-
-        return utemp
+        # utemp is currently (nvars, jpol, ipol, npts) - permute to
+        # (npts, jpol, ipol, nvar) in one go. It is stored in Fortran order
+        # once so it does not have to be copied again by the Fortran
+        # routines every time it is taken from the buffer.
+        return np.asfortranarray(utemp.transpose(3, 1, 2, 0))
 
     def _get_strain_interp(  # NOQA
         self,
@@ -288,15 +300,10 @@ class ReciprocalMergedInstaseisDB(BaseNetCDFInstaseisDB):
         eta,
     ):
         mesh = self.meshes.merged
-        if id_elem not in mesh.strain_buffer:
+        strains = mesh.strain_buffer.get(id_elem)
+        if strains is None:
             utemp = self._get_and_reorder_utemp(id_elem)
 
-            strain_fct_map = {
-                "monopole": sem_derivatives.strain_monopole_td,
-                "dipole": sem_derivatives.strain_dipole_td,
-                "quadpole": sem_derivatives.strain_quadpole_td,
-            }
-
             # We want the cache to work - thus we always have to
             # calculate both! Also I/O is the slow part here.
 
@@ -306,7 +313,7 @@ class ReciprocalMergedInstaseisDB(BaseNetCDFInstaseisDB):
                 utemp_x = np.require(
                     utemp_x, requirements=["F"], dtype=np.float64
                 )
-                strain_x = strain_fct_map["dipole"](
+                strain_x = STRAIN_FCT_MAP["dipole"](
                     utemp_x,
                     G,
                     GT,
@@ -328,8 +335,9 @@ class ReciprocalMergedInstaseisDB(BaseNetCDFInstaseisDB):
                 _s = list(utemp.shape)
                 if _s[-1] == 2:
                     _s[-1] = 3
-                    utemp_new = np.zeros(_s, dtype=utemp.dtype)
+                    utemp_new = np.empty(_s, dtype=utemp.dtype)
                     utemp_new[:, :, :, 0] = utemp[:, :, :, 0]
+                    utemp_new[:, :, :, 1] = 0.0
                     utemp_new[:, :, :, 2] = utemp[:, :, :, 1]
                     utemp_z = utemp_new
                 # Reform all others.
@@ -341,7 +349,7 @@ class ReciprocalMergedInstaseisDB(BaseNetCDFInstaseisDB):
                         utemp_z, requirements=["F"], dtype=np.float64
                     )
 
-                strain_z = strain_fct_map["monopole"](
+                strain_z = STRAIN_FCT_MAP["monopole"](
                     utemp_z,
                     G,
                     GT,
@@ -356,27 +364,30 @@ class ReciprocalMergedInstaseisDB(BaseNetCDFInstaseisDB):
             else:
                 strain_z = None
 
-            mesh.strain_buffer.add(id_elem, (strain_x, strain_z))
-        else:
-            strain_x, strain_z = mesh.strain_buffer.get(id_elem)
+            # Buffered in the working precision.
+            if strain_x is not None:
+                strain_x = strain_x.astype(self._working_dtype, copy=False)
+            if strain_z is not None:
+                strain_z = strain_z.astype(self._working_dtype, copy=False)
+            strains = (strain_x, strain_z)
+            mesh.strain_buffer.add(id_elem, strains)
 
         all_strains = {}
-        for name, strain in (("strain_x", strain_x), ("strain_z", strain_z)):
+        for name, strain in zip(("strain_x", "strain_z"), strains):
             if strain is None:
                 all_strains[name] = None
                 continue
-            final_strain = np.empty((strain.shape[0], 6), order="F")
-
-            for i in range(6):
-                final_strain[:, i] = spectral_basis.lagrange_interpol_2D_td(
-                    col_points_xi, col_points_eta, strain[:, :, :, i], xi, eta
-                )
+            final_strain = spectral_basis.lagrange_interpol_2D_td_batched(
+                col_points_xi, col_points_eta, strain, xi, eta
+            )
 
             if not name == "strain_z":
-                final_strain[:, 3] *= -1.0
-                final_strain[:, 5] *= -1.0
+                # Flips the sign of columns 3 and 5 in one go.
+                final_strain[:, 3::2] *= -1.0
 
-            all_strains[name] = final_strain
+            all_strains[name] = final_strain.astype(
+                self._working_dtype, copy=False
+            )
 
         return all_strains["strain_x"], all_strains["strain_z"]
 
@@ -384,34 +395,22 @@ class ReciprocalMergedInstaseisDB(BaseNetCDFInstaseisDB):
         self, id_elem, gll_point_ids, col_points_xi, col_points_eta, xi, eta
     ):
         mesh = self.meshes.merged
-        if id_elem not in mesh.displ_buffer:
+        utemp = mesh.displ_buffer.get(id_elem)
+        if utemp is None:
             utemp = self._get_and_reorder_utemp(id_elem)
             mesh.displ_buffer.add(id_elem, utemp)
-        else:
-            utemp = mesh.displ_buffer.get(id_elem)
-
-        final_displacement_x = np.empty((utemp.shape[0], 3), order="F")
-        utemp_x = utemp[:, :, :, :3]
-        utemp_x = np.require(utemp_x, requirements=["F"], dtype=np.float64)
-        for i in range(3):
-            final_displacement_x[
-                :, i
-            ] = spectral_basis.lagrange_interpol_2D_td(
-                col_points_xi, col_points_eta, utemp_x[:, :, :, i], xi, eta
-            )
+
+        final_displacement_x = spectral_basis.lagrange_interpol_2D_td_batched(
+            col_points_xi, col_points_eta, utemp[:, :, :, :3], xi, eta
+        )
 
         # Requires a copy to not modify the cached values in place because this
         # array is later modified.
-        utemp_z = utemp[:, :, :, -3:].copy()
+        utemp_z = utemp[:, :, :, -3:].copy(order="F")
         utemp_z[:, :, :, 0] = utemp_z[:, :, :, 1]
         utemp_z[:, :, :, 1][:] = 0
-        utemp_z = np.require(utemp_z, requirements=["F"], dtype=np.float64)
-        final_displacement_z = np.empty((utemp.shape[0], 3), order="F")
-        for i in range(3):
-            final_displacement_z[
-                :, i
-            ] = spectral_basis.lagrange_interpol_2D_td(
-                col_points_xi, col_points_eta, utemp_z[:, :, :, i], xi, eta
-            )
+        final_displacement_z = spectral_basis.lagrange_interpol_2D_td_batched(
+            col_points_xi, col_points_eta, utemp_z, xi, eta
+        )
 
         return final_displacement_x, final_displacement_z
@@ -5,41 +5,136 @@ Originally from https://gist.github.com/jdreaver/0be2e44981159d0854f5
 """
 from PySide2 import QtGui
 from PySide2 import QtWidgets
-import numpy as np
+import functools
+import math
 import re
+import sys
 
-# Regular expression to find floats. Match groups are the whole string, the
-# whole coefficient, the decimal part of the coefficient, and the exponent
-# part.
-_float_re = re.compile(r"(([+-]?\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?)")
+# fastnumbers is an optional dependency that parses floats a lot faster than
+# the builtin float().
+try:
+    from fastnumbers import fast_float
+except ImportError:  # pragma: no cover
+    _to_float = float
+else:
+    _to_float = functools.partial(fast_float, raise_on_invalid=True)
 
+# Regular expression to find floats. The only capturing groups are the
+# coefficient and the exponent part including the exponent character.
+_float_re = re.compile(
+    r"(?P<coef>[+-]?\d+(?:\.\d*)?|\.\d+)(?P<exp>[eE][+-]?\d+)?"
+)
 
+# Deterministic finite automaton accepting exactly the strings fully matched
+# by the regular expression above. Much cheaper than the regex engine for the
+# short strings that are validated on every keystroke.
+_DIGIT, _DOT, _SIGN, _EXP, _OTHER = range(5)
+_char_classes = {".": _DOT, "+": _SIGN, "-": _SIGN, "e": _EXP, "E": _EXP}
+_transitions = [
+    # digit, dot, sign, exp, other
+    [2, 4, 1, -1, -1],  # 0: start
+    [2, -1, -1, -1, -1],  # 1: sign
+    [2, 3, -1, 6, -1],  # 2: integer part
+    [5, -1, -1, 6, -1],  # 3: decimal point after integer part
+    [5, -1, -1, -1, -1],  # 4: leading decimal point
+    [5, -1, -1, 6, -1],  # 5: decimal part
+    [8, -1, 7, -1, -1],  # 6: exponent character
+    [8, -1, -1, -1, -1],  # 7: exponent sign
+    [8, -1, -1, -1, -1],  # 8: exponent
+]
+_accepting = (False, False, True, True, False, True, False, False, True)
+
+# Flat version of the transition table indexed by (state << 3) | char_class
+# to avoid the nested list lookups in the inner loop.
+_flat_transitions = [-1] * (len(_transitions) << 3)
+for _state, _row in enumerate(_transitions):
+    _flat_transitions[_state << 3 : (_state << 3) + len(_row)] = _row  # NOQA
+del _state, _row
+
+# Strings longer than this are validated with the regular expression.
+_MAX_DFA_LENGTH = 32
+
+# Largest number of decimals Qt supports for a QDoubleSpinBox.
+_MAX_DECIMALS = sys.float_info.max_10_exp + sys.float_info.dig
+
+# Validator states - looked up once instead of on every keystroke.
+_ACCEPTABLE = QtGui.QValidator.Acceptable
+_INTERMEDIATE = QtGui.QValidator.Intermediate
+_INVALID = QtGui.QValidator.Invalid
+
+
+@functools.lru_cache(maxsize=256)
 def valid_float_string(string):
-    match = _float_re.search(string)
-    return match.groups()[0] == string if match else False
+    # Plain integers are the most common input and can be checked without
+    # looping over the characters in Python.
+    if string.isdecimal():
+        return True
+    # Long strings, e.g. pasted ones, are faster to check with the regex
+    # engine than by stepping through the DFA in Python.
+    if len(string) > _MAX_DFA_LENGTH:
+        return _float_re.fullmatch(string) is not None
+    state = 0
+    for char in string:
+        if char.isdecimal():
+            char_class = _DIGIT
+        else:
+            char_class = _char_classes.get(char, _OTHER)
+        state = _flat_transitions[(state << 3) | char_class]
+        if state < 0:
+            return False
+    return _accepting[state]
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_float(string):
+    """
+    Returns the value of a valid float string and None otherwise.
+
+    Cached so validate() and valueFromText() only parse each text once.
+    """
+    if not valid_float_string(string):
+        return None
+    return _to_float(string)
 
 
 class FloatValidator(QtGui.QValidator):
     def validate(self, string, position):
-        string = str(string)
-        if valid_float_string(string):
-            return (self.Acceptable, string, position)
-        if string == "" or string[position - 1] in "e.-+":
-            return (self.Intermediate, string, position)
-        return (self.Invalid, string, position)
+        # PySide2 already passes str objects.
+        if type(string) is not str:
+            string = str(string)
+        # Empty and single character inputs are very common while typing
+        # and can be classified without running the full validation.
+        if not string or (len(string) == 1 and string in "e.-+"):
+            return (_INTERMEDIATE, string, position)
+        if _parse_float(string) is not None:
+            return (_ACCEPTABLE, string, position)
+        # Cannot fail as the string is not empty at this point.
+        if string[position - 1] in "e.-+":
+            return (_INTERMEDIATE, string, position)
+        return (_INVALID, string, position)
 
     def fixup(self, text):
         match = _float_re.search(text)
-        return match.groups()[0] if match else ""
+        return match.group(0) if match else ""
+
+
+# The validator holds no per widget state so it can be shared by all spin
+# boxes.
+_shared_validator = FloatValidator()
 
 
 class ScientificDoubleSpinBox(QtWidgets.QDoubleSpinBox):
     def __init__(self, *args, **kwargs):
         super(ScientificDoubleSpinBox, self).__init__(*args, **kwargs)
-        self.setMinimum(-np.inf)
-        self.setMaximum(np.inf)
-        self.validator = FloatValidator()
-        self.setDecimals(1000)
+        self.setMinimum(-math.inf)
+        self.setMaximum(math.inf)
+        self.validator = _shared_validator
+        # Qt rounds all values to this many decimals so it cannot be small
+        # without losing tiny values. Qt clamps it to DBL_MAX_10_EXP +
+        # DBL_DIG anyway so request exactly that.
+        self.setDecimals(_MAX_DECIMALS)
+        # Text, coefficient, and exponent suffix of the last stepped value.
+        self._step_state = (None, 0.0, "")
 
     def validate(self, text, position):
         return self.validator.validate(text, position)
@@ -48,22 +143,48 @@ class ScientificDoubleSpinBox(QtWidgets.QDoubleSpinBox):
         return self.validator.fixup(text)
 
     def valueFromText(self, text):
-        return float(text)
+        value = _parse_float(text)
+        if value is None:
+            return _to_float(text)
+        return value
 
     def textFromValue(self, value):
         return format_float(value)
 
     def stepBy(self, steps):
         text = self.cleanText()
-        groups = _float_re.search(text).groups()
-        decimal = float(groups[1])
+        if text == self._step_state[0]:
+            _, decimal, exponent = self._step_state
+        else:
+            match = _float_re.search(text)
+            decimal = float(match["coef"])
+            exponent = match["exp"] or ""
         decimal += steps
-        new_string = "{:g}".format(decimal) + (groups[3] if groups[3] else "")
+        coefficient = format(decimal, "g")
+        new_string = coefficient + exponent
+        # Remember the new state so repeated steps do not have to parse the
+        # text again. Only safe if the coefficient has no exponent itself.
+        if "e" not in coefficient and valid_float_string(coefficient):
+            self._step_state = (new_string, float(coefficient), exponent)
         self.lineEdit().setText(new_string)
 
 
 def format_float(value):
     """Modified form of the 'g' format specifier."""
-    string = "{:g}".format(value).replace("e+", "e")
-    string = re.sub(r"e(-?)0*(\d+)", r"e\1\2", string)
-    return string
+    # 0.0 and -0.0 compare and hash equal so they would share a cache entry.
+    if value == 0:
+        return format(value, "g")
+    return _format_float(value)
+
+
+@functools.lru_cache(maxsize=1024)
+def _format_float(value):
+    string = format(value, "g")
+    index = string.find("e")
+    if index < 0:
+        return string
+    # The 'g' format always writes the sign of the exponent. Drop it if
+    # positive and strip the leading zeros of the exponent.
+    sign = "-" if string[index + 1] == "-" else ""
+    exponent = string[index + 2 :].lstrip("0") or "0"  # NOQA
+    return string[: index + 1] + sign + exponent
@@ -163,6 +163,20 @@ def io_chunker(arr):
     return idx
 
 
+def io_ranges(arr, max_gap=1):
+    """
+    Assumes arr is a sorted array of unique indices. Returns the start and
+    stop indices of the ranges covering it, where successive indices are
+    merged into the same range if they differ by at most max_gap. Reading a
+    few unneeded items is usually much cheaper than an additional read.
+    """
+    arr = np.asarray(arr)
+    breaks = np.flatnonzero(np.diff(arr) > max_gap) + 1
+    starts = arr[np.concatenate([[0], breaks])]
+    stops = arr[np.concatenate([breaks - 1, [len(arr) - 1]])] + 1
+    return starts, stops
+
+
 def rfftfreq(n, d=1.0):  # pragma: no cover
     """
     Polyfill for numpy's rfftfreq() for numpy versions that don't have it.
@@ -218,6 +218,89 @@ def rotate_vector_xyz_src_to_xyz_rec(vec, srclon, srccolat, reclon, reccolat):
     return np.dot(rotmat, vec)
 
 
+def _rotation_matrix_xyz_src_to_mesh(srclon, srccolat, reclon, reccolat, phi):
+    """
+    Rotation matrix from a cartesian system with the z axis aligned with the
+    source to the AxiSEM s, phi, z system of the receiver. This is the
+    product of the rotation matrices of rotate_vector_xyz_src_to_xyz_earth,
+    rotate_vector_xyz_earth_to_xyz_src and rotate_vector_xyz_to_src.
+    """
+    ct1, st1 = np.cos(srccolat), np.sin(srccolat)
+    cp1, sp1 = np.cos(srclon), np.sin(srclon)
+    ct2, st2 = np.cos(reccolat), np.sin(reccolat)
+    cp2, sp2 = np.cos(reclon), np.sin(reclon)
+    cp3, sp3 = np.cos(phi), np.sin(phi)
+
+    R1 = np.array(
+        [
+            [ct1 * cp1, -sp1, st1 * cp1],
+            [ct1 * sp1, cp1, st1 * sp1],
+            [-st1, 0.0, ct1],
+        ]
+    )
+    R2 = np.array(
+        [
+            [ct2 * cp2, -sp2, st2 * cp2],
+            [ct2 * sp2, cp2, st2 * sp2],
+            [-st2, 0.0, ct2],
+        ]
+    )
+    R3 = np.array([[cp3, sp3, 0.0], [-sp3, cp3, 0.0], [0.0, 0.0, 1.0]])
+
+    return R3.dot(R2.T).dot(R1)
+
+
+def rotate_symm_tensor_voigt_xyz_src_to_mesh(
+    mt, srclon, srccolat, reclon, reccolat, phi
+):
+    """
+    rotates a tensor from a cartesian system xyz with z axis aligned with the
+    source to the AxiSEM s, phi, z system aligned with the receiver on the
+    s = 0 axis
+
+    Same as chaining rotate_symm_tensor_voigt_xyz_src_to_xyz_earth,
+    rotate_symm_tensor_voigt_xyz_earth_to_xyz_src and
+    rotate_symm_tensor_voigt_xyz_to_src but with a single rotation.
+    """
+    A = np.array(
+        [
+            [mt[0], mt[5], mt[4]],  # NOQA
+            [mt[5], mt[1], mt[3]],
+            [mt[4], mt[3], mt[2]],
+        ]
+    )
+
+    R = _rotation_matrix_xyz_src_to_mesh(
+        srclon, srccolat, reclon, reccolat, phi
+    )
+
+    # Same as in rotate_symm_tensor_voigt_xyz_earth_to_xyz_src: use quad
+    # precision for the numerically tricky double matrix product.
+    R = np.require(R, dtype=np.float128)  # NOQA
+    A = np.require(A, dtype=np.float128)  # NOQA
+
+    B = np.dot(np.dot(R, A), R.T)  # NOQA
+
+    return np.require(
+        np.array([B[0, 0], B[1, 1], B[2, 2], B[1, 2], B[0, 2], B[0, 1]]),
+        dtype=np.float64,
+    )
+
+
+def rotate_vector_xyz_src_to_mesh(
+    vec, srclon, srccolat, reclon, reccolat, phi
+):
+    """
+    Same as chaining rotate_vector_xyz_src_to_xyz_earth,
+    rotate_vector_xyz_earth_to_xyz_src and rotate_vector_xyz_to_src but with
+    a single rotation.
+    """
+    R = _rotation_matrix_xyz_src_to_mesh(
+        srclon, srccolat, reclon, reccolat, phi
+    )
+    return np.dot(R, vec)
+
+
 def coord_transform_lat_lon_depth_to_xyz(
     latitude, longitude, depth_in_m, planet_radius=6371e3
 ):
@@ -23,7 +23,8 @@ lib = load_lib()
 def _strain_td(
     u, G, GT, xi, eta, npol, nsamp, nodes, element_type, axial, fct  # NOQA
 ):
-    strain_tensor = np.zeros(
+    # All components are written by the Fortran routines.
+    strain_tensor = np.empty(
         (nsamp, npol + 1, npol + 1, 6), np.float64, order="F"
     )
     u = np.require(u, dtype=np.float64, requirements=["F_CONTIGUOUS"])
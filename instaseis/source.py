@@ -13,6 +13,7 @@ Source and Receiver classes of Instaseis.
 import collections
 import functools
 import io
+import math
 import numpy as np
 import obspy
 import obspy.core.inventory
@@ -235,15 +236,15 @@ class SourceOrReceiver(object):
 
     @property
     def colatitude_rad(self):
-        return np.deg2rad(90.0 - self.latitude)
+        return math.radians(90.0 - self.latitude)
 
     @property
     def longitude_rad(self):
-        return np.deg2rad(self.longitude)
+        return math.radians(self.longitude)
 
     @property
     def latitude_rad(self):
-        return np.deg2rad(self.latitude)
+        return math.radians(self.latitude)
 
     def radius_in_m(self, planet_radius=6371e3):
         if self.depth_in_m is None:
@@ -658,27 +659,38 @@ class Source(SourceOrReceiver, SourceTimeFunction):
         )
 
     def __str__(self):
-        return_str = "Instaseis Source:\n"
-        return_str += "\tOrigin Time      : %s\n" % (self.origin_time,)
-        return_str += "\tLongitude        : %6.1f deg\n" % (self.longitude,)
-        return_str += "\tLatitude         : %6.1f deg\n" % (self.latitude,)
-        return_str += "\tDepth            : %s km\n" % (
-            "%6.1e km" % (self.depth_in_m / 1e3)
-            if self.depth_in_m is not None
-            else " not set"
-        )
-        return_str += "\tMoment Magnitude :   %4.2f\n" % (
-            self.moment_magnitude,
+        return (
+            "Instaseis Source:\n"
+            "\tOrigin Time      : {origin_time!s}\n"
+            "\tLongitude        : {longitude:6.1f} deg\n"
+            "\tLatitude         : {latitude:6.1f} deg\n"
+            "\tDepth            : {depth} km\n"
+            "\tMoment Magnitude :   {moment_magnitude:4.2f}\n"
+            "\tScalar Moment    : {M0:10.2e} Nm\n"
+            "\tMrr              : {m_rr:10.2e} Nm\n"
+            "\tMtt              : {m_tt:10.2e} Nm\n"
+            "\tMpp              : {m_pp:10.2e} Nm\n"
+            "\tMrt              : {m_rt:10.2e} Nm\n"
+            "\tMrp              : {m_rp:10.2e} Nm\n"
+            "\tMtp              : {m_tp:10.2e} Nm\n"
+        ).format(
+            origin_time=self.origin_time,
+            longitude=self.longitude,
+            latitude=self.latitude,
+            depth=(
+                "%6.1e km" % (self.depth_in_m / 1e3)
+                if self.depth_in_m is not None
+                else " not set"
+            ),
+            moment_magnitude=self.moment_magnitude,
+            M0=self.M0,
+            m_rr=self.m_rr,
+            m_tt=self.m_tt,
+            m_pp=self.m_pp,
+            m_rt=self.m_rt,
+            m_rp=self.m_rp,
+            m_tp=self.m_tp,
         )
-        return_str += "\tScalar Moment    : %10.2e Nm\n" % (self.M0,)
-        return_str += "\tMrr              : %10.2e Nm\n" % (self.m_rr,)
-        return_str += "\tMtt              : %10.2e Nm\n" % (self.m_tt,)
-        return_str += "\tMpp              : %10.2e Nm\n" % (self.m_pp,)
-        return_str += "\tMrt              : %10.2e Nm\n" % (self.m_rt,)
-        return_str += "\tMrp              : %10.2e Nm\n" % (self.m_rp,)
-        return_str += "\tMtp              : %10.2e Nm\n" % (self.m_tp,)
-
-        return return_str
 
 
 class ForceSource(SourceOrReceiver, SourceTimeFunction):
@@ -769,15 +781,22 @@ class ForceSource(SourceOrReceiver, SourceTimeFunction):
         return np.array([self.f_r, self.f_t, self.f_p])
 
     def __str__(self):
-        return_str = "Instaseis Force Source:\n"
-        return_str += "\tOrigin Time      : %s\n" % (self.origin_time,)
-        return_str += "\tLongitude : %6.1f deg\n" % (self.longitude)
-        return_str += "\tLatitude  : %6.1f deg\n" % (self.latitude)
-        return_str += "\tFr        : %10.2e N\n" % (self.f_r)
-        return_str += "\tFt        : %10.2e N\n" % (self.f_t)
-        return_str += "\tFp        : %10.2e N\n" % (self.f_p)
-
-        return return_str
+        return (
+            "Instaseis Force Source:\n"
+            "\tOrigin Time      : {origin_time!s}\n"
+            "\tLongitude : {longitude:6.1f} deg\n"
+            "\tLatitude  : {latitude:6.1f} deg\n"
+            "\tFr        : {f_r:10.2e} N\n"
+            "\tFt        : {f_t:10.2e} N\n"
+            "\tFp        : {f_p:10.2e} N\n"
+        ).format(
+            origin_time=self.origin_time,
+            longitude=self.longitude,
+            latitude=self.latitude,
+            f_r=self.f_r,
+            f_t=self.f_t,
+            f_p=self.f_p,
+        )
 
 
 class Receiver(SourceOrReceiver):
@@ -834,14 +853,20 @@ class Receiver(SourceOrReceiver):
         assert len(self.location) <= 2
 
     def __str__(self):
-        return_str = "Instaseis Receiver:\n"
-        return_str += "\tLongitude : %6.1f deg\n" % (self.longitude)
-        return_str += "\tLatitude  : %6.1f deg\n" % (self.latitude)
-        return_str += "\tNetwork   : %s\n" % (self.network)
-        return_str += "\tStation   : %s\n" % (self.station)
-        return_str += "\tLocation  : %s\n" % (self.location)
-
-        return return_str
+        return (
+            "Instaseis Receiver:\n"
+            "\tLongitude : {longitude:6.1f} deg\n"
+            "\tLatitude  : {latitude:6.1f} deg\n"
+            "\tNetwork   : {network!s}\n"
+            "\tStation   : {station!s}\n"
+            "\tLocation  : {location!s}\n"
+        ).format(
+            longitude=self.longitude,
+            latitude=self.latitude,
+            network=self.network,
+            station=self.station,
+            location=self.location,
+        )
 
     @staticmethod
     @_purge_duplicates
@@ -1724,45 +1749,35 @@ class FiniteSource(object):
         ) is None:
             self.find_hypocenter()
 
-        return_str = "Instaseis Finite Source:\n"
-        return_str += "\tMoment Magnitude     : %4.2f\n" % (
-            self.moment_magnitude
-        )
-        return_str += "\tScalar Moment        : %10.2e Nm\n" % (self.M0)
-        return_str += "\t#Point Sources       : %d\n" % (self.npointsources)
-        return_str += "\tRupture Duration     : %6.1f s\n" % (
-            self.rupture_duration
-        )
-        return_str += "\tTime Shift           : %6.1f s\n" % (self.time_shift)
-
-        return_str += "\tMin Depth            : %6.1f m\n" % (
-            self.min_depth_in_m
-        )
-        return_str += "\tMax Depth            : %6.1f m\n" % (
-            self.max_depth_in_m
-        )
-        return_str += "\tHypocenter Depth     : %6.1f m\n" % (
-            self.max_depth_in_m
-        )
-
-        return_str += "\tMin Latitude         : %6.1f deg\n" % (
-            self.min_latitude
-        )
-        return_str += "\tMax Latitude         : %6.1f deg\n" % (
-            self.max_latitude
-        )
-        return_str += "\tHypocenter Latitude  : %6.1f deg\n" % (
-            self.hypocenter_latitude
-        )
-
-        return_str += "\tMin Longitude        : %6.1f deg\n" % (
-            self.min_longitude
-        )
-        return_str += "\tMax Longitude        : %6.1f deg\n" % (
-            self.max_longitude
-        )
-        return_str += "\tHypocenter Longitude : %6.1f deg\n" % (
-            self.hypocenter_longitude
+        return (
+            "Instaseis Finite Source:\n"
+            "\tMoment Magnitude     : {moment_magnitude:4.2f}\n"
+            "\tScalar Moment        : {M0:10.2e} Nm\n"
+            "\t#Point Sources       : {npointsources:d}\n"
+            "\tRupture Duration     : {rupture_duration:6.1f} s\n"
+            "\tTime Shift           : {time_shift:6.1f} s\n"
+            "\tMin Depth            : {min_depth:6.1f} m\n"
+            "\tMax Depth            : {max_depth:6.1f} m\n"
+            "\tHypocenter Depth     : {hypocenter_depth:6.1f} m\n"
+            "\tMin Latitude         : {min_latitude:6.1f} deg\n"
+            "\tMax Latitude         : {max_latitude:6.1f} deg\n"
+            "\tHypocenter Latitude  : {hypocenter_latitude:6.1f} deg\n"
+            "\tMin Longitude        : {min_longitude:6.1f} deg\n"
+            "\tMax Longitude        : {max_longitude:6.1f} deg\n"
+            "\tHypocenter Longitude : {hypocenter_longitude:6.1f} deg\n"
+        ).format(
+            moment_magnitude=self.moment_magnitude,
+            M0=self.M0,
+            npointsources=self.npointsources,
+            rupture_duration=self.rupture_duration,
+            time_shift=self.time_shift,
+            min_depth=self.min_depth_in_m,
+            max_depth=self.max_depth_in_m,
+            hypocenter_depth=self.max_depth_in_m,
+            min_latitude=self.min_latitude,
+            max_latitude=self.max_latitude,
+            hypocenter_latitude=self.hypocenter_latitude,
+            min_longitude=self.min_longitude,
+            max_longitude=self.max_longitude,
+            hypocenter_longitude=self.hypocenter_longitude,
         )
-
-        return return_str
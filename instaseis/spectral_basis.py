@@ -38,7 +38,7 @@ def lagrange_interpol_2D_td(points1, points2, coefficients, x1, x2):  # NOQA
     n = len(points1) - 1
     nsamp = coefficients.shape[0]
 
-    interpolant = np.zeros(nsamp, dtype="float64", order="F")
+    interpolant = np.empty(nsamp, dtype="float64", order="F")
 
     lib.lagrange_interpol_2D_td(
         C.c_int(n),
@@ -51,3 +51,51 @@ def lagrange_interpol_2D_td(points1, points2, coefficients, x1, x2):  # NOQA
         interpolant.ctypes.data_as(C.POINTER(C.c_double)),
     )
     return interpolant
+
+
+def lagrange_interpol_2D_td_batched(  # NOQA
+    points1, points2, coefficients, x1, x2
+):
+    """
+    Interpolates all fields along the last axis of ``coefficients`` at once.
+
+    Equivalent to calling :func:`lagrange_interpol_2D_td` for each
+    ``coefficients[:, :, :, i]`` but the basis polynomials are only evaluated
+    once. Single precision coefficients are read as they are and accumulated
+    in double precision, so they do not have to be upcast first.
+    """
+    points1 = np.require(
+        points1, dtype=np.float64, requirements=["F_CONTIGUOUS"]
+    )
+    points2 = np.require(
+        points2, dtype=np.float64, requirements=["F_CONTIGUOUS"]
+    )
+    if coefficients.dtype == np.float32:
+        fct = lib.lagrange_interpol_2D_td_batched_sp
+        c_type = C.c_float
+    else:
+        fct = lib.lagrange_interpol_2D_td_batched
+        c_type = C.c_double
+        coefficients = coefficients.astype(np.float64, copy=False)
+    coefficients = np.require(coefficients, requirements=["F_CONTIGUOUS"])
+
+    assert len(points1) == len(points2)
+
+    n = len(points1) - 1
+    nsamp = coefficients.shape[0]
+    ncomp = coefficients.shape[3]
+
+    interpolant = np.empty((nsamp, ncomp), dtype="float64", order="F")
+
+    fct(
+        C.c_int(n),
+        C.c_int(nsamp),
+        C.c_int(ncomp),
+        points1.ctypes.data_as(C.POINTER(C.c_double)),
+        points2.ctypes.data_as(C.POINTER(C.c_double)),
+        coefficients.ctypes.data_as(C.POINTER(c_type)),
+        C.c_double(x1),
+        C.c_double(x2),
+        interpolant.ctypes.data_as(C.POINTER(C.c_double)),
+    )
+    return interpolant
@@ -8,12 +8,14 @@
 
 module spectral_basis
     use global_parameters, only: sp, dp, pi
-    use iso_c_binding, only: c_double, c_int
+    use iso_c_binding, only: c_double, c_float, c_int
 
     implicit none
     private
 
     public :: lagrange_interpol_2D_td
+    public :: lagrange_interpol_2D_td_batched
+    public :: lagrange_interpol_2D_td_batched_sp
 
 contains
 
@@ -30,7 +32,39 @@ subroutine lagrange_interpol_2D_td_wrapped(N, nsamp, points1, points2, coefficie
   real(c_double), intent(in), value  :: x1, x2
   real(c_double), intent(out)        :: interpolant(nsamp)
 
-  interpolant = lagrange_interpol_2D_td(points1, points2, coefficients, x1, x2)
+  call lagrange_interpol_2D_td(points1, points2, coefficients, x1, x2, interpolant)
+end subroutine
+!-----------------------------------------------------------------------------------------
+
+!-----------------------------------------------------------------------------------------
+subroutine lagrange_interpol_2D_td_batched_wrapped(N, nsamp, ncomp, points1, points2, &
+                                                   coefficients, x1, x2, interpolant) &
+  bind(c, name="lagrange_interpol_2D_td_batched")
+
+  integer(c_int), intent(in), value  :: N, nsamp, ncomp
+  real(c_double), intent(in)         :: points1(0:N), points2(0:N)
+  real(c_double), intent(in)         :: coefficients(1:nsamp, 0:N, 0:N, 1:ncomp)
+  real(c_double), intent(in), value  :: x1, x2
+  real(c_double), intent(out)        :: interpolant(nsamp, ncomp)
+
+  call lagrange_interpol_2D_td_batched(points1, points2, coefficients, x1, x2, &
+                                       interpolant)
+end subroutine
+!-----------------------------------------------------------------------------------------
+
+!-----------------------------------------------------------------------------------------
+subroutine lagrange_interpol_2D_td_batched_sp_wrapped(N, nsamp, ncomp, points1, points2, &
+                                                      coefficients, x1, x2, interpolant) &
+  bind(c, name="lagrange_interpol_2D_td_batched_sp")
+
+  integer(c_int), intent(in), value  :: N, nsamp, ncomp
+  real(c_double), intent(in)         :: points1(0:N), points2(0:N)
+  real(c_float),  intent(in)         :: coefficients(1:nsamp, 0:N, 0:N, 1:ncomp)
+  real(c_double), intent(in), value  :: x1, x2
+  real(c_double), intent(out)        :: interpolant(nsamp, ncomp)
+
+  call lagrange_interpol_2D_td_batched_sp(points1, points2, coefficients, x1, x2, &
+                                          interpolant)
 end subroutine
 !-----------------------------------------------------------------------------------------
 
@@ -39,46 +73,141 @@ end subroutine
 !-----------------------------------------------------------------------------------------
 !> computes the Lagrangian interpolation polynomial of a function defined by its values at
 !  a set of collocation points in 2D, where the points are a tensorproduct of two sets of
-!  points in 1D, for time dependent coefficients
-function lagrange_interpol_2D_td(points1, points2, coefficients, x1, x2)
+!  points in 1D, for time dependent coefficients. The result is written directly to
+!  interpolant to avoid a temporary copy.
+subroutine lagrange_interpol_2D_td(points1, points2, coefficients, x1, x2, interpolant)
 
   real(dp), intent(in)  :: points1(0:), points2(0:)
   real(dp), intent(in)  :: coefficients(:,0:,0:)
   real(dp), intent(in)  :: x1, x2
-  real(dp)              :: lagrange_interpol_2D_td(size(coefficients,1))
+  real(dp), intent(out) :: interpolant(:)
   real(dp)              :: l_i(0:size(points1)-1), l_j(0:size(points2)-1)
+  real(dp)              :: w(0:size(points1)-1, 0:size(points2)-1)
 
-  integer               :: i, j, m1, m2, n1, n2
+  integer               :: i, j, n1, n2
 
   n1 = size(points1) - 1
   n2 = size(points2) - 1
 
-  do i=0, n1
-     l_i(i) = 1
-     do m1=0, n1
-        if (m1 == i) cycle
-        l_i(i) = l_i(i) * (x1 - points1(m1)) / (points1(i) - points1(m1))
+  call lagrange_basis(points1, x1, l_i)
+  call lagrange_basis(points2, x2, l_j)
+
+  ! tensor product weights, so the time loop is a single multiply-add per point
+  do j=0, n2
+     w(:,j) = l_i(:) * l_j(j)
+  enddo
+
+  interpolant(:) = 0
+
+  ! loop in memory order of the coefficients
+  do j=0, n2
+     do i=0, n1
+        interpolant(:) = interpolant(:) + coefficients(:,i,j) * w(i,j)
      enddo
   enddo
 
+end subroutine lagrange_interpol_2D_td
+!-----------------------------------------------------------------------------------------
+
+!-----------------------------------------------------------------------------------------
+!> same as lagrange_interpol_2D_td, but for several time dependent fields sharing the same
+!  collocation points, so the basis polynomials are only evaluated once
+subroutine lagrange_interpol_2D_td_batched(points1, points2, coefficients, x1, x2, &
+                                           interpolant)
+
+  real(dp), intent(in)  :: points1(0:), points2(0:)
+  real(dp), intent(in)  :: coefficients(:,0:,0:,:)
+  real(dp), intent(in)  :: x1, x2
+  real(dp), intent(out) :: interpolant(:,:)
+  real(dp)              :: l_i(0:size(points1)-1), l_j(0:size(points2)-1)
+  real(dp)              :: w(0:size(points1)-1, 0:size(points2)-1)
+
+  integer               :: i, j, k, n1, n2
+
+  n1 = size(points1) - 1
+  n2 = size(points2) - 1
+
+  call lagrange_basis(points1, x1, l_i)
+  call lagrange_basis(points2, x2, l_j)
+
+  ! tensor product weights, so the time loop is a single multiply-add per point
   do j=0, n2
-     l_j(j) = 1
-     do m2=0, n2
-        if (m2 == j) cycle
-        l_j(j) = l_j(j) * (x2 - points2(m2)) / (points2(j) - points2(m2))
+     w(:,j) = l_i(:) * l_j(j)
+  enddo
+
+  interpolant(:,:) = 0
+
+  ! loop in memory order of the coefficients
+  do k=1, size(coefficients,4)
+     do j=0, n2
+        do i=0, n1
+           interpolant(:,k) = interpolant(:,k) + coefficients(:,i,j,k) * w(i,j)
+        enddo
      enddo
   enddo
 
-  lagrange_interpol_2D_td(:) = 0
+end subroutine lagrange_interpol_2D_td_batched
+!-----------------------------------------------------------------------------------------
+
+!-----------------------------------------------------------------------------------------
+!> same as lagrange_interpol_2D_td_batched, but for single precision coefficients as they
+!  are stored in the databases. The accumulation is done in double precision.
+subroutine lagrange_interpol_2D_td_batched_sp(points1, points2, coefficients, x1, x2, &
+                                              interpolant)
+
+  real(dp), intent(in)  :: points1(0:), points2(0:)
+  real(sp), intent(in)  :: coefficients(:,0:,0:,:)
+  real(dp), intent(in)  :: x1, x2
+  real(dp), intent(out) :: interpolant(:,:)
+  real(dp)              :: l_i(0:size(points1)-1), l_j(0:size(points2)-1)
+  real(dp)              :: w(0:size(points1)-1, 0:size(points2)-1)
+
+  integer               :: i, j, k, n1, n2
+
+  n1 = size(points1) - 1
+  n2 = size(points2) - 1
+
+  call lagrange_basis(points1, x1, l_i)
+  call lagrange_basis(points2, x2, l_j)
+
+  do j=0, n2
+     w(:,j) = l_i(:) * l_j(j)
+  enddo
+
+  interpolant(:,:) = 0
 
-  do i=0, n1
+  do k=1, size(coefficients,4)
      do j=0, n2
-        lagrange_interpol_2D_td(:) = lagrange_interpol_2D_td(:) &
-                                     + coefficients(:,i,j) * l_i(i) * l_j(j)
+        do i=0, n1
+           interpolant(:,k) = interpolant(:,k) + real(coefficients(:,i,j,k), dp) * w(i,j)
+        enddo
+     enddo
+  enddo
+
+end subroutine lagrange_interpol_2D_td_batched_sp
+!-----------------------------------------------------------------------------------------
+
+!-----------------------------------------------------------------------------------------
+!> values of the Lagrangian basis polynomials of a set of collocation points in 1D at x
+subroutine lagrange_basis(points, x, l)
+
+  real(dp), intent(in)  :: points(0:)
+  real(dp), intent(in)  :: x
+  real(dp), intent(out) :: l(0:)
+
+  integer               :: i, m, n
+
+  n = size(points) - 1
+
+  do i=0, n
+     l(i) = 1
+     do m=0, n
+        if (m == i) cycle
+        l(i) = l(i) * (x - points(m)) / (points(i) - points(m))
      enddo
   enddo
 
-end function lagrange_interpol_2D_td
+end subroutine lagrange_basis
 !-----------------------------------------------------------------------------------------
 
 end module
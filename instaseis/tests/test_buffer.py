@@ -9,6 +9,8 @@ Tests for the array buffer.
     GNU Lesser General Public License, Version 3 [non-commercial/academic use]
     (http://www.gnu.org/copyleft/lgpl.html)
 """
+import concurrent.futures
+
 import numpy as np
 
 from instaseis.database_interfaces.mesh import Buffer
@@ -40,3 +42,55 @@ def test_buffer():
     # Once more not in.
     assert "d" not in buf
     assert buf.efficiency == 2.0 / 4.0
+
+
+def test_buffer_get_and_eviction():
+    buf = Buffer(max_size_in_mb=1.0)
+    assert buf.get("a") is None
+    assert buf.get("a", default=1) == 1
+
+    third = (1024 ** 2) // 3
+    buf.add("a", np.empty(third, dtype=np.int8))
+    buf.add("b", np.empty(third, dtype=np.int8))
+    buf.add("c", np.empty(third, dtype=np.int8))
+
+    # Accessing "a" makes "b" the stalest item which is removed first.
+    assert buf.get("a") is not None
+    buf.add("d", np.empty(third, dtype=np.int8))
+    assert buf.get("b") is None
+    assert buf.get("a") is not None
+    assert buf.get("c") is not None
+    assert buf.get("d") is not None
+    assert buf._total_size == 3 * third
+
+    # Replacing an item does not count its size twice.
+    buf.add("d", np.empty(third, dtype=np.int8))
+    assert buf._total_size == 3 * third
+
+    # get() also counts for the efficiency: 4 hits and 3 misses.
+    assert buf.efficiency == 4.0 / 7.0
+
+
+def test_buffer_threads():
+    """
+    Concurrent lookups and insertions, constantly evicting each others
+    items.
+    """
+    buf = Buffer(max_size_in_mb=1.0)
+    size = (1024 ** 2) // 4
+
+    def _work(offset):
+        for i in range(2000):
+            key = (i + offset) % 10
+            value = buf.get(key)
+            if value is None:
+                value = np.full(size, key, dtype=np.int8)
+                buf.add(key, value)
+            assert value[0] == key
+        return True
+
+    with concurrent.futures.ThreadPoolExecutor(4) as executor:
+        assert all(executor.map(_work, range(8)))
+
+    assert buf._total_size <= 1024 ** 2
+    assert buf._total_size == sum(_i.nbytes for _i in buf._buffer.values())
@@ -9,7 +9,9 @@ Tests for some helper routines.
     GNU Lesser General Public License, Version 3 [non-commercial/academic use]
     (http://www.gnu.org/copyleft/lgpl.html)
 """
-from instaseis.helpers import io_chunker
+import numpy as np
+
+from instaseis.helpers import io_chunker, io_ranges
 
 
 def test_io_chunker():
@@ -27,3 +29,27 @@ def test_io_chunker():
     # A couple more complex cases.
     assert io_chunker([0, 1, 2, 4, 6, 7, 8]) == [[0, 3], 4, [6, 9]]
     assert io_chunker([0, 2, 4, 6, 7, 8, 10]) == [0, 2, 4, [6, 9], 10]
+
+
+def test_io_ranges():
+    def _ranges(arr, max_gap=1):
+        return [list(_i) for _i in zip(*io_ranges(arr, max_gap=max_gap))]
+
+    # Single continuous reads possible.
+    assert _ranges([0, 1, 2]) == [[0, 3]]
+    assert _ranges([1, 2, 3, 4, 5, 6, 7]) == [[1, 8]]
+    assert _ranges(np.array([5])) == [[5, 6]]
+
+    # Without allowed gaps every continuous run is its own range.
+    assert _ranges([0, 1, 2, 4, 6, 7, 8]) == [[0, 3], [4, 5], [6, 9]]
+    assert _ranges([0, 2, 4, 6, 7, 8, 10]) == [
+        [0, 1],
+        [2, 3],
+        [4, 5],
+        [6, 9],
+        [10, 11],
+    ]
+
+    # Small gaps are bridged.
+    assert _ranges([0, 1, 2, 4, 6, 7, 8], max_gap=2) == [[0, 9]]
+    assert _ranges([0, 4, 8, 9, 20, 24], max_gap=4) == [[0, 10], [20, 25]]
@@ -17,6 +17,7 @@ import numpy as np
 import obspy
 import os
 import pytest
+import scipy.fft
 import shutil
 
 import instaseis
@@ -628,10 +629,11 @@ def test_incremental_fwd():
         rtol=1e-7,
         atol=1e-16,
     )
+    # The displacements of all meshes are buffered together in the first one.
     assert instaseis_fwd.meshes.m1.displ_buffer.efficiency == 0.0
-    assert instaseis_fwd.meshes.m2.displ_buffer.efficiency == 0.0
-    assert instaseis_fwd.meshes.m3.displ_buffer.efficiency == 0.0
-    assert instaseis_fwd.meshes.m4.displ_buffer.efficiency == 0.0
+    assert instaseis_fwd.meshes.m2.displ_buffer.get_size_mb() == 0.0
+    assert instaseis_fwd.meshes.m3.displ_buffer.get_size_mb() == 0.0
+    assert instaseis_fwd.meshes.m4.displ_buffer.get_size_mb() == 0.0
 
     # read the same again to test buffer
     st_fwd = instaseis_fwd.get_seismograms(
@@ -668,9 +670,9 @@ def test_incremental_fwd():
         atol=1e-16,
     )
     assert instaseis_fwd.meshes.m1.displ_buffer.efficiency == 1.0 / 2.0
-    assert instaseis_fwd.meshes.m2.displ_buffer.efficiency == 1.0 / 2.0
-    assert instaseis_fwd.meshes.m3.displ_buffer.efficiency == 1.0 / 2.0
-    assert instaseis_fwd.meshes.m4.displ_buffer.efficiency == 1.0 / 2.0
+    assert instaseis_fwd.meshes.m2.displ_buffer.get_size_mb() == 0.0
+    assert instaseis_fwd.meshes.m3.displ_buffer.get_size_mb() == 0.0
+    assert instaseis_fwd.meshes.m4.displ_buffer.get_size_mb() == 0.0
 
 
 def test_incremental_bwd_strain_only():
@@ -1093,6 +1095,113 @@ def test_finite_source(bwd_db):
     assert st != st_2
 
 
+@pytest.mark.parametrize("bwd_db", BW_DISPL_DBS)
+def test_finite_source_workers(bwd_db, monkeypatch):
+    """
+    Extracting the seismograms of a finite source with several threads must
+    give the same result as the serial extraction.
+    """
+    from obspy.signal.filter import lowpass
+
+    # Small blocks so several windows of sources are in flight one after
+    # the other, also with a partial last block.
+    monkeypatch.setattr(
+        "instaseis.database_interfaces.base_instaseis_db."
+        "FINITE_SOURCE_BLOCK_SIZE",
+        3,
+    )
+
+    # Tiny buffers so the threads constantly evict each others elements.
+    instaseis_bwd = find_and_open_files(bwd_db, buffer_size_in_mb=0.1)
+    receiver = Receiver(latitude=42.6390, longitude=74.4940)
+
+    dt = instaseis_bwd.info.dt
+    sliprate = np.zeros(1000)
+    sliprate[0] = 1.0
+    sliprate = lowpass(sliprate, 1.0 / 100.0, 1.0 / dt, corners=4)
+
+    sources = []
+    for lat, lng in [
+        (89.91, 0.0),
+        (10.0, 20.0),
+        (-30.0, 40.0),
+        (50.0, -5.0),
+        (10.0, 20.0),
+        (-60.0, 120.0),
+        (0.0, -150.0),
+        (89.91, 0.0),
+    ]:
+        source = Source(
+            latitude=lat,
+            longitude=lng,
+            depth_in_m=12000,
+            m_rr=4.710000e24 / 1e7,
+            m_tt=3.810000e22 / 1e7,
+            m_pp=-4.740000e24 / 1e7,
+            m_rt=3.990000e23 / 1e7,
+            m_rp=-8.050000e23 / 1e7,
+            m_tp=-1.230000e24 / 1e7,
+        )
+        source.set_sliprate(sliprate, dt, time_shift=0.0, normalize=True)
+        sources.append(source)
+
+    # Record the number of threads of every FFT.
+    fft_workers = []
+    rfft = scipy.fft.rfft
+
+    def _rfft(*args, **kwargs):
+        fft_workers.append(kwargs["workers"])
+        return rfft(*args, **kwargs)
+
+    monkeypatch.setattr("scipy.fft.rfft", _rfft)
+
+    st_serial = instaseis_bwd.get_seismograms_finite_source(
+        sources=sources, receiver=receiver, correct_mu=True
+    )
+    assert set(fft_workers) == {-1}
+
+    # The pool threads must not start their own FFT threads.
+    fft_workers.clear()
+    st_threaded = instaseis_bwd.get_seismograms_finite_source(
+        sources=sources, receiver=receiver, correct_mu=True, workers=4
+    )
+    assert set(fft_workers) == {1}
+
+    assert st_serial == st_threaded
+
+
+@pytest.mark.parametrize("bwd_db", BW_DISPL_DBS)
+def test_finite_source_prefetch(bwd_db):
+    """
+    The coordinates and kd-tree queries of the point sources are prefetched
+    once per finite source and released again afterwards.
+    """
+    instaseis_bwd = find_and_open_files(bwd_db)
+    receiver = Receiver(latitude=42.6390, longitude=74.4940)
+
+    sources = [
+        Source(latitude=lat, longitude=20.0, depth_in_m=12000, m_rr=1e17)
+        for lat in (10.0, 20.0, 30.0)
+    ]
+    for source in sources:
+        source.set_sliprate_dirac(instaseis_bwd.info.dt, 1000)
+
+    calls = []
+    get_coordinates = instaseis_bwd._get_coordinates
+
+    def _get_coordinates(source, receiver):
+        calls.append(source)
+        return get_coordinates(source, receiver)
+
+    instaseis_bwd._get_coordinates = _get_coordinates
+
+    instaseis_bwd.get_seismograms_finite_source(
+        sources=sources, receiver=receiver
+    )
+    assert calls == sources
+    assert instaseis_bwd._finite_source_prefetch == {}
+
+
 def test_get_band_code_method():
     """
     Dummy test assuring the band code is determined correctly.
@@ -2228,6 +2337,90 @@ def test_read_on_demand(database_folder, read_on_demand):
     )
 
 
+@pytest.mark.parametrize("bwd_db", BW_DISPL_DBS)
+def test_single_precision(bwd_db):
+    """
+    Single precision seismograms must be close to the double precision ones.
+    """
+    db_double = find_and_open_files(bwd_db)
+    db_single = find_and_open_files(bwd_db, precision="single")
+
+    receiver = Receiver(latitude=42.6390, longitude=74.4940)
+    source = Source(
+        latitude=89.91,
+        longitude=0.0,
+        depth_in_m=12000,
+        m_rr=4.710000e24 / 1e7,
+        m_tt=3.810000e22 / 1e7,
+        m_pp=-4.740000e24 / 1e7,
+        m_rt=3.990000e23 / 1e7,
+        m_rp=-8.050000e23 / 1e7,
+        m_tp=-1.230000e24 / 1e7,
+    )
+
+    components = db_double.available_components
+    st_double = db_double.get_seismograms(
+        source=source, receiver=receiver, components=components
+    )
+    st_single = db_single.get_seismograms(
+        source=source, receiver=receiver, components=components
+    )
+
+    for tr_double, tr_single in zip(st_double, st_single):
+        assert tr_single.data.dtype == np.float32
+        np.testing.assert_allclose(
+            tr_single.data,
+            tr_double.data,
+            rtol=1e-4,
+            atol=1e-4 * np.abs(tr_double.data).max(),
+        )
+
+    # The strain is also buffered in single precision.
+    strains = []
+    for mesh in db_single.meshes:
+        if mesh is None:
+            continue
+        for value in mesh.strain_buffer._buffer.values():
+            strains.extend(value if isinstance(value, tuple) else [value])
+    strains = [_i for _i in strains if _i is not None]
+    assert strains
+    assert all(_i.dtype == np.float32 for _i in strains)
+
+    with pytest.raises(ValueError):
+        find_and_open_files(bwd_db, precision="quad")
+
+
+@pytest.mark.parametrize("bwd_db", BW_DISPL_DBS)
+def test_chunk_cache_size(bwd_db, tmpdir):
+    """
+    The chunk cache size is passed on to HDF5 and does not change results.
+    """
+    # HDF5 shares file handles within a process so the settings only take
+    # effect for files that are not yet open - use a copy.
+    db_copy = os.path.join(tmpdir.strpath, "db")
+    shutil.copytree(bwd_db, db_copy)
+    db_cache = find_and_open_files(db_copy, chunk_cache_size_in_mb=4)
+    cache = db_cache.parsed_mesh.f.id.get_access_plist().get_cache()
+    assert cache[1] == 100003
+    assert cache[2] == 4 * 1024 ** 2
+
+    db = find_and_open_files(bwd_db)
+
+    receiver = Receiver(latitude=42.6390, longitude=74.4940)
+    source = Source(
+        latitude=89.91, longitude=0.0, depth_in_m=12000, m_rr=4.71e17
+    )
+    components = db.available_components
+    st = db.get_seismograms(
+        source=source, receiver=receiver, components=components
+    )
+    st_cache = db_cache.get_seismograms(
+        source=source, receiver=receiver, components=components
+    )
+    for tr, tr_cache in zip(st, st_cache):
+        np.testing.assert_array_equal(tr.data, tr_cache.data)
+
+
 @pytest.mark.skipif(
     "merged_100s_db_fwd" not in _CONFIG_DBS["databases"],
     reason="requires generated tests databases.",
@@ -204,6 +204,40 @@ def test_rotate_vector_xyz_src_to_xyz_rec():
     np.testing.assert_allclose(wref, w, atol=1e-10)
 
 
+def test_rotate_tensor_xyz_src_to_mesh():
+    mt = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+    srclon, srccolat = np.radians(13.0), np.radians(29.0)
+    reclon, reccolat = np.radians(-47.0), np.radians(112.0)
+    phi = np.radians(71.0)
+    mt_rot = rotations.rotate_symm_tensor_voigt_xyz_src_to_mesh(
+        mt, srclon, srccolat, reclon, reccolat, phi
+    )
+
+    mt_ref = rotations.rotate_symm_tensor_voigt_xyz_src_to_xyz_earth(
+        mt, srclon, srccolat
+    )
+    mt_ref = rotations.rotate_symm_tensor_voigt_xyz_earth_to_xyz_src(
+        mt_ref, reclon, reccolat
+    )
+    mt_ref = rotations.rotate_symm_tensor_voigt_xyz_to_src(mt_ref, phi)
+    np.testing.assert_allclose(mt_ref, mt_rot, atol=1e-10)
+
+
+def test_rotate_vector_xyz_src_to_mesh():
+    v = np.array([1.0, 2.0, 3.0])
+    srclon, srccolat = np.radians(13.0), np.radians(29.0)
+    reclon, reccolat = np.radians(-47.0), np.radians(112.0)
+    phi = np.radians(71.0)
+    w = rotations.rotate_vector_xyz_src_to_mesh(
+        v, srclon, srccolat, reclon, reccolat, phi
+    )
+
+    wref = rotations.rotate_vector_xyz_src_to_xyz_earth(v, srclon, srccolat)
+    wref = rotations.rotate_vector_xyz_earth_to_xyz_src(wref, reclon, reccolat)
+    wref = rotations.rotate_vector_xyz_to_src(wref, phi)
+    np.testing.assert_allclose(wref, w, atol=1e-10)
+
+
 def test_coord_transform_lat_lon_depth_to_xyz():
     latitude, longitude, depth_in_m = 0.0, 0.0, 0.0
     xyz = rotations.coord_transform_lat_lon_depth_to_xyz(
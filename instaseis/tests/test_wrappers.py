@@ -12,7 +12,7 @@ Mostly testing the various wrappers.
 import numpy as np
 
 
-from instaseis import finite_elem_mapping, rotations
+from instaseis import finite_elem_mapping, rotations, spectral_basis
 
 
 def test_rotate_frame_rd():
@@ -28,6 +28,49 @@ def test_rotate_frame_rd():
     assert abs(z - 4309398.5475913) < 1e-2
 
 
+def test_lagrange_interpol_2D_td_batched():  # NOQA
+    """
+    The batched interpolation must match interpolating each field separately.
+    """
+    points = np.array([-1.0, -0.65465367, 0.0, 0.65465367, 1.0])
+    coefficients = np.asfortranarray(
+        np.random.RandomState(12345).randn(20, 5, 5, 6)
+    )
+
+    batched = spectral_basis.lagrange_interpol_2D_td_batched(
+        points, points, coefficients, 0.3, -0.7
+    )
+    assert batched.shape == (20, 6)
+    for i in range(6):
+        np.testing.assert_allclose(
+            batched[:, i],
+            spectral_basis.lagrange_interpol_2D_td(
+                points, points, coefficients[:, :, :, i], 0.3, -0.7
+            ),
+            rtol=1e-12,
+        )
+
+
+def test_lagrange_interpol_2D_td_batched_single_precision():  # NOQA
+    """
+    Single precision coefficients are interpolated without upcasting them
+    first but must give the same result as the upcast ones.
+    """
+    points = np.array([-1.0, -0.65465367, 0.0, 0.65465367, 1.0])
+    coefficients = np.asfortranarray(
+        np.random.RandomState(12345).randn(20, 5, 5, 6), dtype=np.float32
+    )
+
+    single = spectral_basis.lagrange_interpol_2D_td_batched(
+        points, points, coefficients, 0.3, -0.7
+    )
+    double = spectral_basis.lagrange_interpol_2D_td_batched(
+        points, points, coefficients.astype(np.float64), 0.3, -0.7
+    )
+    assert single.dtype == np.float64
+    np.testing.assert_allclose(single, double, rtol=1e-12)
+
+
 def test_inside_element():
     nodes = np.array(
         [